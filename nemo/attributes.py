@@ -0,0 +1,194 @@
+"""
+ Copyright (c) 2022 OctMedia
+
+ Permission is hereby granted, free of charge, to any person obtaining a copy of
+ this software and associated documentation files (the "Software"), to deal in
+ the Software without restriction, including without limitation the rights to
+ use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+ the Software, and to permit persons to whom the Software is furnished to do so,
+ subject to the following conditions:
+
+ The above copyright notice and this permission notice shall be included in all
+ copies or substantial portions of the Software.
+
+ THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+ FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+ COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+ IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+ CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+ """
+
+from collections import namedtuple, OrderedDict
+
+import maya.api.OpenMaya as om2
+
+AttributeRecord = namedtuple('AttributeRecord', ['name', 'type', 'lock', 'keyable', 'channel_box', 'min', 'max', 'enum_field', 'source', 'self_source'])
+
+DEFAULT_ATTRIBUTES = {'translateX', 'translateY', 'translateZ', 'rotateX', 'rotateY', 'rotateZ', 'scaleX', 'scaleY', 'scaleZ', 'visibility', 'rotateOrder'}
+
+NUMERIC_TYPES = {
+    om2.MFnNumericData.kBoolean: 'bool',
+    om2.MFnNumericData.kByte: 'byte',
+    om2.MFnNumericData.kChar: 'char',
+    om2.MFnNumericData.kShort: 'short',
+    om2.MFnNumericData.kInt: 'long',
+    om2.MFnNumericData.kFloat: 'float',
+    om2.MFnNumericData.kDouble: 'double',
+    om2.MFnNumericData.k2Short: 'short2',
+    om2.MFnNumericData.k3Short: 'short3',
+    om2.MFnNumericData.k2Int: 'long2',
+    om2.MFnNumericData.k3Int: 'long3',
+    om2.MFnNumericData.k2Float: 'float2',
+    om2.MFnNumericData.k3Float: 'float3',
+    om2.MFnNumericData.k2Double: 'double2',
+    om2.MFnNumericData.k3Double: 'double3',
+    om2.MFnNumericData.k4Double: 'double4',
+}
+
+UNIT_TYPES = {
+    om2.MFnUnitAttribute.kDistance: 'doubleLinear',
+    om2.MFnUnitAttribute.kAngle: 'doubleAngle',
+    om2.MFnUnitAttribute.kTime: 'time',
+}
+
+TYPED_TYPES = {
+    om2.MFnData.kString: 'string',
+    om2.MFnData.kMatrix: 'matrix',
+    om2.MFnData.kMesh: 'mesh',
+    om2.MFnData.kNurbsCurve: 'nurbsCurve',
+    om2.MFnData.kNurbsSurface: 'nurbsSurface',
+}
+
+
+def is_in_array(attr):
+    fn = om2.MFnAttribute(attr)
+    while True:
+        if fn.array:
+            return True
+        if fn.parent.isNull():
+            return False
+        fn = om2.MFnAttribute(fn.parent)
+
+
+def get_attribute_type(attr):
+    if attr.hasFn(om2.MFn.kEnumAttribute):
+        return 'enum'
+    if attr.hasFn(om2.MFn.kUnitAttribute):
+        return UNIT_TYPES.get(om2.MFnUnitAttribute(attr).unitType(), 'double')
+    if attr.hasFn(om2.MFn.kNumericAttribute):
+        return NUMERIC_TYPES.get(om2.MFnNumericAttribute(attr).numericType(), 'double')
+    if attr.hasFn(om2.MFn.kTypedAttribute):
+        return TYPED_TYPES.get(om2.MFnTypedAttribute(attr).attrType(), 'data')
+    if attr.hasFn(om2.MFn.kMatrixAttribute):
+        return 'matrix'
+    if attr.hasFn(om2.MFn.kMessageAttribute):
+        return 'message'
+    if attr.hasFn(om2.MFn.kCompoundAttribute):
+        return 'TdataCompound'
+    return None
+
+
+def get_enum_field(attr):
+    fn = om2.MFnEnumAttribute(attr)
+    result = []
+    for value in range(fn.getMin(), fn.getMax() + 1):
+        try:
+            result.append((fn.fieldName(value), value))
+        except RuntimeError:
+            continue
+    return result
+
+
+def to_ui_value(value):
+    if isinstance(value, tuple):
+        value = value[0]
+    if isinstance(value, (om2.MAngle, om2.MDistance, om2.MTime)):
+        return value.asUnits(value.uiUnit())
+    return value
+
+
+def get_range(attr):
+    if attr.hasFn(om2.MFn.kUnitAttribute):
+        fn = om2.MFnUnitAttribute(attr)
+    elif attr.hasFn(om2.MFn.kNumericAttribute):
+        fn = om2.MFnNumericAttribute(attr)
+    else:
+        return None, None
+    minimum = to_ui_value(fn.getMin()) if fn.hasMin() else None
+    maximum = to_ui_value(fn.getMax()) if fn.hasMax() else None
+    return minimum, maximum
+
+
+def read_record(obj, attr, plug):
+    attr_type = get_attribute_type(attr)
+    minimum, maximum = get_range(attr)
+    source = None
+    self_source = False
+    if plug.isDestination:
+        source_plug = plug.source()
+        source = source_plug.partialName(includeNodeName=True, useLongNames=True)
+        self_source = source_plug.node() == obj
+    return AttributeRecord(name=om2.MFnAttribute(attr).name,
+                           type=attr_type,
+                           lock=plug.isLocked,
+                           keyable=plug.isKeyable,
+                           channel_box=plug.isChannelBox,
+                           min=minimum,
+                           max=maximum,
+                           enum_field=get_enum_field(attr) if attr_type == 'enum' else None,
+                           source=source,
+                           self_source=self_source)
+
+
+def read_attributes(obj):
+    node = om2.MFnDependencyNode(obj)
+    keyable = []
+    channel_box = []
+    others = []
+    for i in range(node.attributeCount()):
+        attr = node.attribute(i)
+        if is_in_array(attr):
+            continue
+        plug = om2.MPlug(obj, attr)
+        if plug.isKeyable:
+            keyable.append((attr, plug))
+        elif plug.isChannelBox:
+            channel_box.append((attr, plug))
+        elif om2.MFnAttribute(attr).name in DEFAULT_ATTRIBUTES:
+            others.append((attr, plug))
+
+    records = OrderedDict()
+    for attr, plug in keyable + channel_box + others:
+        record = read_record(obj, attr, plug)
+        records[record.name] = record
+    return records
+
+
+def is_channel_box_record(record):
+    if not record.keyable and not record.channel_box:
+        return False
+    if record.lock or record.type in {'string', 'double3'}:
+        return False
+    if record.type == 'enum' and record.name != 'rotateOrder' and len(record.enum_field) == 1:
+        return False
+    return True
+
+
+class AttributeReader(object):
+
+    def __init__(self):
+        self.records = dict()
+
+    def read(self, node, obj=None):
+        if node not in self.records:
+            if obj is None:
+                obj = om2.MGlobal.getSelectionListByName(node).getDependNode(0)
+            self.records[node] = read_attributes(obj)
+        return self.records[node]
+
+    def get(self, node, attr):
+        return self.read(node).get(attr)
+
+    def list_channel_box(self, node, obj=None):
+        return [x.name for x in self.read(node, obj).values() if is_channel_box_record(x)]
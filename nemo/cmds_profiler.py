@@ -0,0 +1,109 @@
+"""
+ Copyright (c) 2022 OctMedia
+
+ Permission is hereby granted, free of charge, to any person obtaining a copy of
+ this software and associated documentation files (the "Software"), to deal in
+ the Software without restriction, including without limitation the rights to
+ use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+ the Software, and to permit persons to whom the Software is furnished to do so,
+ subject to the following conditions:
+
+ The above copyright notice and this permission notice shall be included in all
+ copies or substantial portions of the Software.
+
+ THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+ FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+ COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+ IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+ CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+ """
+
+import os
+import sys
+import json
+from timeit import default_timer
+from functools import wraps
+
+
+class CommandProfiler(object):
+    """
+    counts calls and cumulative time of every command of a cmds-like module while active, per command and call site.
+    Any module or object exposing commands as attributes can stand in for maya.cmds:
+
+        with CommandProfiler(fake_cmds) as profiler:
+            get_io(controllers, shapes)
+        assert profiler.count('listConnections') < 100
+    """
+
+    def __init__(self, module=None, call_sites=True):
+        if module is None:
+            from maya import cmds as module
+        self.module = module
+        self.call_sites = call_sites
+        self.records = dict()
+        self.originals = dict()
+
+    def __enter__(self):
+        for name in dir(self.module):
+            func = getattr(self.module, name)
+            if name.startswith('_') or not callable(func) or isinstance(func, type):
+                continue
+            self.originals[name] = func
+            setattr(self.module, name, self.wrap(name, func))
+        return self
+
+    def __exit__(self, *args):
+        for name, func in self.originals.items():
+            setattr(self.module, name, func)
+        self.originals.clear()
+
+    def wrap(self, name, func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            site = None
+            if self.call_sites:
+                frame = sys._getframe(1)
+                site = '{}:{}({})'.format(os.path.basename(frame.f_code.co_filename), frame.f_lineno, frame.f_code.co_name)
+            begin = default_timer()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record = self.records.setdefault((name, site), [0, 0.0])
+                record[0] += 1
+                record[1] += default_timer() - begin
+        return wrapper
+
+    def count(self, command=None):
+        return sum(x[0] for key, x in self.records.items() if command is None or key[0] == command)
+
+    def seconds(self, command=None):
+        return sum(x[1] for key, x in self.records.items() if command is None or key[0] == command)
+
+    def summary(self):
+        # command -> {'count', 'seconds', 'sites': {site: {'count', 'seconds'}}}, most called first
+        commands = dict()
+        for (name, site), (count, seconds) in self.records.items():
+            entry = commands.setdefault(name, {'count': 0, 'seconds': 0.0, 'sites': dict()})
+            entry['count'] += count
+            entry['seconds'] += seconds
+            if site:
+                entry['sites'][site] = {'count': count, 'seconds': seconds}
+        return commands
+
+    def to_json(self):
+        return {'total': {'count': self.count(), 'seconds': self.seconds()}, 'commands': self.summary()}
+
+    def dump(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_json(), f, indent=2)
+
+    def report(self, top=20, sites=3):
+        commands = self.summary()
+        lines = ['{} calls, {:.3f}s'.format(self.count(), self.seconds())]
+        for name in sorted(commands, key=lambda x: -commands[x]['count'])[:top]:
+            entry = commands[name]
+            lines.append('{:>8} {:>9.3f}s  {}'.format(entry['count'], entry['seconds'], name))
+            for site in sorted(entry['sites'], key=lambda x: -entry['sites'][x]['count'])[:sites]:
+                lines.append('{:>8} {:>9.3f}s      {}'.format(entry['sites'][site]['count'], entry['sites'][site]['seconds'], site))
+        return '\n'.join(lines)
@@ -0,0 +1,61 @@
+"""
+ Copyright (c) 2022 OctMedia
+
+ Permission is hereby granted, free of charge, to any person obtaining a copy of
+ this software and associated documentation files (the "Software"), to deal in
+ the Software without restriction, including without limitation the rights to
+ use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+ the Software, and to permit persons to whom the Software is furnished to do so,
+ subject to the following conditions:
+
+ The above copyright notice and this permission notice shall be included in all
+ copies or substantial portions of the Software.
+
+ THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+ FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+ COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+ IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+ CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+ """
+
+import maya.api.OpenMaya as om2
+
+
+def read_sources(obj):
+    sources = dict()
+    for plug in om2.MFnDependencyNode(obj).getConnections():
+        if not plug.isDestination:
+            continue
+        source = plug.source()
+        source_node = source.node()
+        sources[plug.partialName(useLongNames=True)] = (om2.MFnDependencyNode(source_node).name(),
+                                                       source.partialName(includeNodeName=True, useLongNames=True), source_node == obj)
+    return sources
+
+
+class ConnectionIndex(object):
+
+    def __init__(self, nodes=()):
+        self.sources = dict()
+        for x in nodes:
+            self.read(x)
+
+    def read(self, node):
+        if node not in self.sources:
+            self.sources[node] = read_sources(om2.MGlobal.getSelectionListByName(node).getDependNode(0))
+        return self.sources[node]
+
+    def source(self, node, attr):
+        return self.read(node).get(attr)
+
+    def source_plug(self, node, attr):
+        source = self.source(node, attr)
+        return source[1] if source else None
+
+    def is_driven(self, node, attr):
+        return attr in self.read(node)
+
+    def is_self_driven(self, node, attr):
+        source = self.source(node, attr)
+        return bool(source and source[2])
@@ -0,0 +1,157 @@
+"""
+ Copyright (c) 2022 OctMedia
+
+ Permission is hereby granted, free of charge, to any person obtaining a copy of
+ this software and associated documentation files (the "Software"), to deal in
+ the Software without restriction, including without limitation the rights to
+ use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+ the Software, and to permit persons to whom the Software is furnished to do so,
+ subject to the following conditions:
+
+ The above copyright notice and this permission notice shall be included in all
+ copies or substantial portions of the Software.
+
+ THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+ FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+ COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+ IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+ CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+ """
+
+import bisect
+import fnmatch
+
+
+def _prefix_range(sorted_keys, prefix):
+    begin = bisect.bisect_left(sorted_keys, prefix)
+    end = begin
+    while end < len(sorted_keys) and sorted_keys[end].startswith(prefix):
+        end += 1
+    return sorted_keys[begin:end]
+
+
+# Trie over long DAG paths. Keywords follow the substring rule of the exporter UI (`Geometry|high|`),
+# `^|root|group` anchors a prefix at the DAG root, keywords with `*`, `?` or `[` are globs over the long path.
+class PathIndex(object):
+
+    def __init__(self, paths):
+        self.paths = list(paths)
+        self.segments = ['']
+        self.parents = [-1]
+        self.children = [dict()]
+        self.terminals = [[]]
+        self.nodes_by_segment = dict()
+
+        for i, path in enumerate(self.paths):
+            node = 0
+            for segment in path.split('|')[1:]:
+                child = self.children[node].get(segment)
+                if child is None:
+                    child = len(self.segments)
+                    self.segments.append(segment)
+                    self.parents.append(node)
+                    self.children.append(dict())
+                    self.terminals.append([])
+                    self.children[node][segment] = child
+                    self.nodes_by_segment.setdefault(segment, []).append(child)
+                node = child
+            self.terminals[node].append(i)
+
+        self.sorted_segments = sorted(self.nodes_by_segment)
+        self.sorted_reversed_segments = sorted(x[::-1] for x in self.nodes_by_segment)
+
+        # depth-first layout so every subtree is a contiguous slice of `self.order`
+        self.order = []
+        self.begin = [0] * len(self.segments)
+        self.end = [0] * len(self.segments)
+        stack = [(0, False)]
+        while stack:
+            node, visited = stack.pop()
+            if visited:
+                self.end[node] = len(self.order)
+                continue
+            self.begin[node] = len(self.order)
+            self.order.extend(self.terminals[node])
+            stack.append((node, True))
+            stack.extend((x, False) for x in self.children[node].values())
+
+    def subtree(self, node):
+        return self.order[self.begin[node]:self.end[node]]
+
+    def child_nodes(self, node, prefix):
+        if not prefix:
+            return list(self.children[node].values())
+        return [child for segment, child in self.children[node].items() if segment.startswith(prefix)]
+
+    def descend(self, node, segments, prefix):
+        for segment in segments:
+            node = self.children[node].get(segment)
+            if node is None:
+                return []
+        return self.child_nodes(node, prefix)
+
+    def find_anchored(self, prefix):
+        segments = prefix.split('|')[1:] if prefix.startswith('|') else prefix.split('|')
+        if not segments:
+            return [0]
+        return self.descend(0, segments[:-1], segments[-1])
+
+    def find_substring(self, keyword):
+        parts = keyword.split('|')
+        if len(parts) == 1:
+            nodes = []
+            for segment in self.sorted_segments:
+                if keyword in segment:
+                    nodes.extend(self.nodes_by_segment[segment])
+            return nodes
+
+        head, middle, tail = parts[0], parts[1:-1], parts[-1]
+        nodes = []
+        if middle:
+            for node in self.nodes_by_segment.get(middle[0], []):
+                if self.segments[self.parents[node]].endswith(head):
+                    nodes.extend(self.descend(node, middle[1:], tail))
+        elif head:
+            for reversed_segment in _prefix_range(self.sorted_reversed_segments, head[::-1]):
+                for node in self.nodes_by_segment[reversed_segment[::-1]]:
+                    nodes.extend(self.child_nodes(node, tail))
+        elif tail:
+            for segment in _prefix_range(self.sorted_segments, tail):
+                nodes.extend(self.nodes_by_segment[segment])
+        else:
+            nodes.append(0)
+        return nodes
+
+    def find_glob(self, pattern):
+        literal = pattern
+        for i, c in enumerate(pattern):
+            if c in '*?[':
+                literal = pattern[:i]
+                break
+        if literal.startswith('|') and '|' in literal[1:]:
+            nodes = self.find_anchored(literal[:literal.rindex('|') + 1])
+        else:
+            nodes = [0]
+        indices = set()
+        for node in nodes:
+            indices.update(x for x in self.subtree(node) if fnmatch.fnmatchcase(self.paths[x], pattern))
+        return indices
+
+    def query(self, keyword):
+        if keyword.startswith('^'):
+            nodes = self.find_anchored(keyword[1:])
+        elif any(c in keyword for c in '*?['):
+            return sorted(self.find_glob(keyword))
+        else:
+            nodes = self.find_substring(keyword)
+        indices = set()
+        for node in nodes:
+            indices.update(self.subtree(node))
+        return sorted(indices)
+
+    def find(self, keywords):
+        indices = set()
+        for keyword in keywords:
+            indices.update(self.query(keyword))
+        return [self.paths[x] for x in sorted(indices)]
@@ -22,6 +22,8 @@
 from __future__ import print_function
 from maya import cmds
 from nemo import utils
+from nemo.filter.snapshot import SceneSnapshot
+from nemo.filter.path_index import PathIndex
 import maya.api.OpenMaya as om2
 
 
@@ -39,7 +41,9 @@ def get_enum_field(plug):
     return result
 
 
-def list_channel_box(obj):
+def list_channel_box(obj, reader=None):
+    if reader:
+        return reader.list_channel_box(obj)
     _attributes = (cmds.listAttr(obj, k=True) or []) + \
         (cmds.listAttr(obj, cb=True) or [])
     attributes = []
@@ -56,66 +60,126 @@ def list_channel_box(obj):
     return attributes
 
 
-def get_history(plug):
-    sources = cmds.listConnections(plug, p=True, s=True, d=False)
-    if not sources:
+class HistoryCache(object):
+
+    def __init__(self):
+        self.leaves = dict()
+        self.free = dict()
+        self.visibility_off = dict()
+
+    @staticmethod
+    def list_sources(plug):
+        sources = cmds.listConnections(plug, p=True, s=True, d=False)
+        if sources:
+            return sources
         sources = []
         maya_plug = om2.MGlobal.getSelectionListByName(plug).getPlug(0)
         node = om2.MFnDependencyNode(maya_plug.node())
         for attr in node.getAffectingAttributes(maya_plug.attribute()):
             sources.append(node.findPlug(attr, True).name())
+        return sources
+
+    def get_history(self, plug):
+        # iterative post-order walk, every plug is expanded once per cache
+        stack = [plug]
+        sources = dict()
+        while stack:
+            current = stack[-1]
+            if current in self.leaves:
+                stack.pop()
+            elif current not in sources:
+                sources[current] = self.list_sources(current)
+                stack.extend(x for x in sources[current] if x not in self.leaves and x not in sources)
+            else:
+                stack.pop()
+                if not sources[current]:
+                    self.leaves[current] = [current]
+                    continue
+                leaves = []
+                visited = set()
+                for x in sources[current]:
+                    for leaf in self.leaves.get(x, []):
+                        if leaf not in visited:
+                            visited.add(leaf)
+                            leaves.append(leaf)
+                self.leaves[current] = leaves
+        return self.leaves[plug]
+
+    def is_free(self, plug):
+        if plug not in self.free:
+            if cmds.getAttr(plug, lock=True):
+                self.free[plug] = False
+            else:
+                self.free[plug] = bool(cmds.getAttr(plug, cb=True) or cmds.getAttr(plug, k=True))
+        return self.free[plug]
+
+
+def get_history(plug):
+    return HistoryCache().get_history(plug)
 
-    if not sources:
-        return [plug]
 
-    return sum([get_history(x) for x in sources], [])
+def is_visibility_always_off(obj, snapshot=None, history=None):
+    history = history or HistoryCache()
+    if obj not in history.visibility_off:
+        history.visibility_off[obj] = _is_visibility_always_off(obj, snapshot, history)
+    return history.visibility_off[obj]
 
 
-def is_visibility_always_off(obj):
-    if cmds.getAttr('{}.visibility'.format(obj)):
+def _is_visibility_always_off(obj, snapshot, history):
+    if snapshot:
+        if snapshot.is_visible(obj):
+            return False
+    elif cmds.getAttr('{}.visibility'.format(obj)):
         return False
     plug = '{}.visibility'.format(obj)
-    history = get_history(plug)
-    if not history:
-        return True
-    for x in history:
+    for x in history.get_history(plug):
         if x == plug:
             continue
-        if cmds.getAttr(x, lock=True):
-            continue
-        if cmds.getAttr(x, cb=True) or cmds.getAttr(x, k=True):
+        if history.is_free(x):
             return False
     return True
 
 
-def is_world_visibility_always_off(obj):
-    shapes = cmds.listRelatives(obj, shapes=True, ni=True)
-    if shapes and all(is_visibility_always_off(x) for x in shapes):
+def is_world_visibility_always_off(obj, snapshot=None, history=None):
+    history = history or HistoryCache()
+    if snapshot:
+        shapes = snapshot.list_shapes(obj)
+    else:
+        shapes = cmds.listRelatives(obj, shapes=True, ni=True)
+    if shapes and all(is_visibility_always_off(x, snapshot, history) for x in shapes):
         return True
 
-    segments = cmds.ls(obj, long=True)[0].split('|')[1:]
-    transforms = ['|'.join(segments[:i]) for i in range(1, 1 + len(segments))]
+    if snapshot:
+        transforms = snapshot.list_ancestors(obj) + [snapshot.paths[snapshot.index(obj)]]
+    else:
+        segments = cmds.ls(obj, long=True)[0].split('|')[1:]
+        transforms = ['|'.join(segments[:i]) for i in range(1, 1 + len(segments))]
     for x in transforms:
-        if is_visibility_always_off(x):
+        if is_visibility_always_off(x, snapshot, history):
             return True
     return False
 
 
-def is_channel_box_locked(ctrl):
+def is_channel_box_locked(ctrl, snapshot=None):
+    if snapshot:
+        return all(x == "visibility" for x in snapshot.list_channel_box(ctrl))
     for x in list_channel_box(ctrl):
         if not cmds.getAttr("{}.{}".format(ctrl, x), lock=True) and x != "visibility":
             return False
     return True
 
 
-def is_channel_box_driven(ctrl):
-    for x in list_channel_box(ctrl) + ['translate', 'rotate', 'scale']:
-        if cmds.listConnections("{}.{}".format(ctrl, x), s=True, d=False):
+def is_channel_box_driven(ctrl, connections=None, reader=None):
+    for x in list_channel_box(ctrl, reader) + ['translate', 'rotate', 'scale']:
+        if connections:
+            if connections.is_driven(ctrl, x):
+                return True
+        elif cmds.listConnections("{}.{}".format(ctrl, x), s=True, d=False):
             return True
     return False
 
 
-def get_extra(ctrl):
+def get_extra(ctrl, connections=None, reader=None):
     if ctrl == 'IKArm_R':
         return 'IKExtraArm_R'
     parent = cmds.listRelatives(ctrl, p=True)
@@ -126,40 +190,32 @@ def get_extra(ctrl):
         return None
     if cmds.listRelatives(parent, shapes=True) or not utils.is_matrix_identity(cmds.xform(parent, q=True, m=True, os=True)):
         return None
-    return None if is_channel_box_driven(parent) else parent
+    return None if is_channel_box_driven(parent, connections, reader) else parent
 
 
-def get_controllers(patterns, curve=True, surface=False, free=True, visible=True):
+def get_controllers(patterns, curve=True, surface=False, free=True, visible=True, snapshot=None, history=None):
+    snapshot = snapshot or SceneSnapshot.build()
+    history = history or HistoryCache()
     results = []
     for pattern in patterns:
-        objects = cmds.ls(pattern, transforms=True)
+        objects = cmds.ls(pattern, transforms=True, long=True) or []
         controllers = []
         for obj in objects:
-            shapes = cmds.listRelatives(obj, shapes=True, ni=True) or []
-            pass_test = False
-            for s in shapes:
-                if cmds.getAttr('{}.overrideEnabled'.format(s)) and cmds.getAttr('{}.overrideDisplayType'.format(s)):
-                    continue
-                if curve and cmds.nodeType(s) == 'nurbsCurve':
-                    pass_test = True
-                if surface and cmds.nodeType(obj) == "nurbsSurface":
-                    pass_test = True
-                if not curve and not surface:
-                    pass_test = True
-            if pass_test:
-                controllers.append(obj)
+            if snapshot.is_controller_candidate(obj, curve, surface):
+                controllers.append(snapshot.names[snapshot.index(obj)])
 
         if free:
-            controllers = [ctrl for ctrl in controllers if not is_channel_box_locked(ctrl)]
+            controllers = [ctrl for ctrl in controllers if not is_channel_box_locked(ctrl, snapshot)]
         if visible:
-            controllers = [ctrl for ctrl in controllers if not is_world_visibility_always_off(ctrl)]
+            controllers = [ctrl for ctrl in controllers if not is_world_visibility_always_off(ctrl, snapshot, history)]
         results.extend(controllers)
     return results
 
 
-def get_meshes(patterns):
-    shapes = []
-    for shape in cmds.ls(type='mesh', long=True, ni=True):
-        if any(x in shape for x in patterns):
-            shapes.append(shape)
-    return shapes
\ No newline at end of file
+def build_mesh_index():
+    return PathIndex(cmds.ls(type='mesh', long=True, ni=True) or [])
+
+
+def get_meshes(patterns, index=None):
+    index = index or build_mesh_index()
+    return index.find(patterns)
@@ -0,0 +1,108 @@
+"""
+ Copyright (c) 2022 OctMedia
+
+ Permission is hereby granted, free of charge, to any person obtaining a copy of
+ this software and associated documentation files (the "Software"), to deal in
+ the Software without restriction, including without limitation the rights to
+ use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+ the Software, and to permit persons to whom the Software is furnished to do so,
+ subject to the following conditions:
+
+ The above copyright notice and this permission notice shall be included in all
+ copies or substantial portions of the Software.
+
+ THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+ FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+ COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+ IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+ CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+ """
+
+import maya.api.OpenMaya as om2
+
+from nemo.attributes import AttributeReader
+
+
+class SceneSnapshot(object):
+
+    def __init__(self, reader=None):
+        self.reader = reader or AttributeReader()
+        self.paths = []
+        self.names = []
+        self.types = []
+        self.parents = []
+        self.shapes = []
+        self.visibility = []
+        self.override_enabled = []
+        self.override_display_type = []
+        self.handles = []
+        self.indices = dict()
+
+    @staticmethod
+    def build(reader=None):
+        snapshot = SceneSnapshot(reader)
+        it = om2.MItDag(om2.MItDag.kDepthFirst)
+        while not it.isDone():
+            path = it.getPath()
+            if path.length():
+                snapshot.append(path)
+            it.next()
+        return snapshot
+
+    def append(self, path):
+        fn = om2.MFnDagNode(path)
+        full_path = path.fullPathName()
+        index = len(self.paths)
+        parent = self.indices.get(full_path.rsplit('|', 1)[0], -1)
+
+        self.paths.append(full_path)
+        self.names.append(path.partialPathName())
+        self.types.append(fn.typeName)
+        self.parents.append(parent)
+        self.shapes.append([])
+        self.visibility.append(fn.findPlug('visibility', False).asBool())
+        self.override_enabled.append(fn.findPlug('overrideEnabled', False).asBool())
+        self.override_display_type.append(fn.findPlug('overrideDisplayType', False).asInt())
+        self.handles.append(om2.MObjectHandle(path.node()))
+        self.indices[full_path] = index
+        self.indices.setdefault(self.names[index], index)
+
+        if parent >= 0 and path.node().hasFn(om2.MFn.kShape) and not fn.isIntermediateObject:
+            self.shapes[parent].append(index)
+
+    def index(self, name):
+        if name in self.indices:
+            return self.indices[name]
+        path = om2.MGlobal.getSelectionListByName(name).getDagPath(0)
+        return self.indices[path.fullPathName()]
+
+    def list_shapes(self, name):
+        return [self.paths[x] for x in self.shapes[self.index(name)]]
+
+    def list_ancestors(self, name):
+        ancestors = []
+        parent = self.parents[self.index(name)]
+        while parent >= 0:
+            ancestors.append(self.paths[parent])
+            parent = self.parents[parent]
+        return ancestors[::-1]
+
+    def is_visible(self, name):
+        return self.visibility[self.index(name)]
+
+    def list_channel_box(self, name):
+        index = self.index(name)
+        return self.reader.list_channel_box(self.paths[index], self.handles[index].object())
+
+    def is_controller_candidate(self, name, curve=True, surface=False):
+        for s in self.shapes[self.index(name)]:
+            if self.override_enabled[s] and self.override_display_type[s]:
+                continue
+            if curve and self.types[s] == 'nurbsCurve':
+                return True
+            if surface and self.types[s] == 'nurbsSurface':
+                return True
+            if not curve and not surface:
+                return True
+        return False
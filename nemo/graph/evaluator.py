@@ -0,0 +1,150 @@
+"""
+ Copyright (c) 2022 OctMedia
+
+ Permission is hereby granted, free of charge, to any person obtaining a copy of
+ this software and associated documentation files (the "Software"), to deal in
+ the Software without restriction, including without limitation the rights to
+ use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+ the Software, and to permit persons to whom the Software is furnished to do so,
+ subject to the following conditions:
+
+ The above copyright notice and this permission notice shall be included in all
+ copies or substantial portions of the Software.
+
+ THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+ FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+ COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+ IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+ CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+ """
+
+from collections import OrderedDict
+
+import numpy as np
+
+from nemo.graph import graph as graph_module
+from nemo.graph.ops import OPS
+from nemo.graph.resource import Resource
+
+
+def batch(value, count):
+    # constants are shared by every frame, so they are broadcast without copies
+    value = np.asarray(value)
+    return np.broadcast_to(value[None], (count,) + value.shape)
+
+
+class Evaluator(object):
+    """
+    evaluates every output of a GRAPH for a batch of input values with NumPy
+
+        evaluator = Evaluator(graph.load('Hero__GRAPH.json'), Resource.load('Hero__RESOURCE.nemodata'))
+        pose = evaluator.evaluate({'ctrl.translateX': 1.0})
+
+    RESOURCE entries reach the ops as they are, without the frames axis
+    """
+
+    def __init__(self, graph, resource=None, ops=None):
+        if not isinstance(graph, graph_module.Graph):
+            graph = graph_module.load(graph)
+        self.graph = graph
+        self.resource = resource or Resource()
+        self.ops = ops or OPS
+        self.order = graph.sort()
+
+    def list_unsupported(self):
+        return sorted({x.method for x in self.graph.nodes if x.method not in self.ops})
+
+    def check(self):
+        unsupported = self.list_unsupported()
+        if unsupported:
+            raise RuntimeError("[Nemo]methods not supported offline: {}".format(', '.join(unsupported)))
+
+    def read(self, values, x, count):
+        if isinstance(x, list):
+            return [self.read(values, y, count) for y in x]
+        if x not in values:
+            if x in self.graph.values:
+                values[x] = batch(graph_module.to_array(self.graph.values[x], self.graph.types[x]), count)
+            elif x in self.graph.elements:
+                source, index = self.graph.elements[x]
+                values[x] = np.asarray(self.read(values, source, count))[(slice(None),) + tuple(index)]
+            elif x in self.graph.resources:
+                entry = self.graph.resources[x]
+                values[x] = self.resource.get(entry['id'], entry['type'])
+            else:
+                raise KeyError("[Nemo]variable {} is neither produced, an input, a constant nor in the RESOURCE".format(x))
+        return values[x]
+
+    def run(self, inputs, count):
+        """
+        inputs: port name -> array with count as first axis; returns port name -> array with count as first axis
+        """
+        self.check()
+        unknown = [x for x in inputs if x not in self.graph.inputs]
+        if unknown:
+            raise KeyError("[Nemo]unknown inputs: {}".format(', '.join(sorted(unknown))))
+        missing = [x for x in self.graph.inputs if x not in inputs]
+        if missing:
+            raise KeyError("[Nemo]inputs without value: {}".format(', '.join(missing)))
+        values = dict()
+        for name, index in self.graph.inputs.items():
+            value = np.asarray(inputs[name])
+            if value.shape[:1] != (count,):
+                raise ValueError("[Nemo]input {} has shape {}, expected {} frames first".format(name, value.shape, count))
+            if self.graph.types[index] == 'Mat4':
+                value = value.reshape(count, 4, 4)
+            values[index] = value
+
+        for i in self.order:
+            node = self.graph.nodes[i]
+            args = graph_module.apply_indices(node, [self.read(values, x, count) for x in node.inputs])
+            results = self.ops[node.method](*args)
+            if len(node.outputs) == 1:
+                results = (results,)
+            for index, value in zip(node.outputs, results):
+                values[index] = value
+        return OrderedDict((name, self.read(values, index, count)) for name, index in self.graph.outputs.items())
+
+    def evaluate(self, inputs):
+        # a single pose, values without the frames axis
+        outputs = self.run({k: np.asarray(v)[None] for k, v in inputs.items()}, 1)
+        return OrderedDict((k, v[0]) for k, v in outputs.items())
+
+
+if __name__ == '__main__':
+    # python -m nemo.graph.evaluator <GRAPH json> <inputs json> [--resource <nemodata>] [--output <npz>]
+    # inputs json: port name -> value for one pose, or -> list of values per frame with --frames
+    import json
+    import argparse
+
+    parser = argparse.ArgumentParser(description="evaluate a Nemo GRAPH without Maya")
+    parser.add_argument('graph')
+    parser.add_argument('inputs')
+    parser.add_argument('--resource')
+    parser.add_argument('--output')
+    parser.add_argument('--frames', action='store_true', help="input values carry one entry per frame")
+    parser.add_argument('--config', help="Config JSON; inputs is then a .npy [frames x columns] array in Config order, angles in radians")
+    parser.add_argument('--chunk', type=int, help="frames evaluated at once, sized from the first frame's outputs by default")
+    args = parser.parse_args()
+
+    evaluator = Evaluator(graph_module.load(args.graph), Resource.load(args.resource) if args.resource else None)
+    if args.config:
+        from nemo.graph.frames import evaluate_frames
+        with open(args.config) as f:
+            config = json.load(f)
+        outputs = evaluate_frames(evaluator, config, np.load(args.inputs), chunk=args.chunk)
+    elif args.frames:
+        with open(args.inputs) as f:
+            inputs = json.load(f)
+        count = len(next(iter(inputs.values())))
+        outputs = evaluator.run(inputs, count)
+    else:
+        with open(args.inputs) as f:
+            inputs = json.load(f)
+        outputs = evaluator.evaluate(inputs)
+    if args.output:
+        np.savez(args.output, **outputs)
+    else:
+        for name, value in outputs.items():
+            print("{} {}".format(name, np.asarray(value).tolist()))
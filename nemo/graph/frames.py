@@ -0,0 +1,90 @@
+"""
+ Copyright (c) 2022 OctMedia
+
+ Permission is hereby granted, free of charge, to any person obtaining a copy of
+ this software and associated documentation files (the "Software"), to deal in
+ the Software without restriction, including without limitation the rights to
+ use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+ the Software, and to permit persons to whom the Software is furnished to do so,
+ subject to the following conditions:
+
+ The above copyright notice and this permission notice shall be included in all
+ copies or substantial portions of the Software.
+
+ THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+ FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+ COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+ IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+ CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+ """
+
+from collections import OrderedDict
+
+import numpy as np
+
+# number of columns each Config JSON port type takes in a frames array; Angle and Euler columns are radians
+WIDTHS = {'Float': 1, 'Angle': 1, 'Bool': 1, 'Int': 1, 'Vec3': 3, 'Euler': 3, 'Mat4': 16}
+
+# output bytes per chunk when it is sized from the first frame; per-vertex intermediates like skinning matrices are a
+# few times larger than the meshes they produce
+CHUNK_BYTES = 1 << 26
+
+
+def list_columns(config, names=None):
+    """
+    returns port name -> (first column, width, type) for the given input names, all Config inputs by default
+    """
+    types = OrderedDict((x['name'], x['type']) for x in config['inputs'])
+    columns = OrderedDict()
+    start = 0
+    for name in names or types.keys():
+        if types[name] not in WIDTHS:
+            raise ValueError("[Nemo]input {} of type {} can't be read from frames".format(name, types[name]))
+        columns[name] = (start, WIDTHS[types[name]], types[name])
+        start += WIDTHS[types[name]]
+    return columns
+
+
+def split(columns, frames):
+    inputs = dict()
+    for name, (start, width, typename) in columns.items():
+        value = frames[:, start:start + width]
+        if typename == 'Mat4':
+            value = value.reshape(-1, 4, 4)
+        elif width == 1:
+            value = value[:, 0]
+        if typename == 'Bool':
+            value = value != 0
+        elif typename == 'Int':
+            value = value.astype(int)
+        inputs[name] = value
+    return inputs
+
+
+def evaluate_frames(evaluator, config, frames, names=None, chunk=None):
+    """
+    frames: [frames x columns] array, the columns of each input follow Config order (or names) and its width, angles
+    in radians. Every node runs once per chunk of frames; chunk bounds the memory of per-vertex data like skinning
+    matrices. By default it is sized from the outputs of the first frame, so dense meshes get small chunks.
+    Returns output name -> [frames x ...] arrays, e.g. [frames x verts x 3] for meshes.
+    """
+    frames = np.asarray(frames, dtype=float)
+    columns = list_columns(config, names)
+    width = sum(x[1] for x in columns.values())
+    if frames.ndim != 2 or frames.shape[1] != width:
+        raise ValueError("[Nemo]frames should be [frames x {}], got {}".format(width, frames.shape))
+
+    if not len(frames):
+        return OrderedDict()
+    chunks = []
+    start = 0
+    if chunk is None:
+        chunks.append(evaluator.run(split(columns, frames[:1]), 1))
+        size = sum(np.asarray(x).nbytes for x in chunks[0].values())
+        chunk = max(1, CHUNK_BYTES // max(size, 1))
+        start = 1
+    for start in range(start, len(frames), chunk):
+        part = frames[start:start + chunk]
+        chunks.append(evaluator.run(split(columns, part), len(part)))
+    return OrderedDict((name, np.concatenate([np.asarray(x[name]) for x in chunks])) for name in chunks[0])
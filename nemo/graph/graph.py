@@ -0,0 +1,319 @@
+"""
+ Copyright (c) 2022 OctMedia
+
+ Permission is hereby granted, free of charge, to any person obtaining a copy of
+ this software and associated documentation files (the "Software"), to deal in
+ the Software without restriction, including without limitation the rights to
+ use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+ the Software, and to permit persons to whom the Software is furnished to do so,
+ subject to the following conditions:
+
+ The above copyright notice and this permission notice shall be included in all
+ copies or substantial portions of the Software.
+
+ THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+ FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+ COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+ IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+ CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+ """
+
+
+import json
+from collections import OrderedDict
+
+import numpy as np
+
+# GRAPH JSON as written by ProcGraph::dump in libNemoGraph and read back by ProcGraph::load:
+#
+#   {
+#     "timestamp": "...", "types": [...] | null, "topology": [{"vertex": <index>, "topology": <id>, "uv": <id>}],
+#     "nodes": [                                            # declarations, vertices refer to them by name
+#       {"name": "<method>", "module": "<module>", "inputs": [{"type": "Mat4[]", "is_stack": true}, ...],
+#        "outputs": [{"type": "Mat4"}]}
+#     ],
+#     "vertices": [
+#       {"node": "<method>", "name": "<debug name>",
+#        "attributes": [{"index": <input>, "value": <value>} | {"index": <input>, "values": [{"value": <value>}, ...]}]}
+#     ]
+#   }
+#
+# a value is a literal (Mat4 as 16 floats), {"vertex": <index>, "attribute": <port>} reading another vertex, with an
+# "index" list to read an element of an array output, or {"id": <id>, "type": "<type>"} reading entry <id> of the
+# RESOURCE. Attributes number a node's inputs then its outputs. Array typed inputs ("Float[]", "Mat4[]") take "values",
+# one item per element, with an "index" list for the masked ones ([?] in the module specs).
+#
+# Graph inputs and outputs are vertices of the builtin nodes INPUT_<type> and OUTPUT_<type>; with Construct<VecN>
+# and DECOMPOSE_<VecN> they aren't declared in "nodes". A declared node is named after its spec method, or after its
+# maya type for unnamed methods; is_dummy methods never get a node, the parser forwards their input instead.
+# Checked by loading and dumping graphs through ProcGraph::load/dump of lib/centos7-2019/libNemoGraph.so.
+
+HEADER_INPUT = 'INPUT_'
+HEADER_OUTPUT = 'OUTPUT_'
+VECTORS = {'Vec2': 2, 'Vec3': 3, 'Vec4': 4}
+BUILTINS = dict(
+    [('Construct' + k, (['Float'] * n, [k])) for k, n in VECTORS.items()] +
+    [('DECOMPOSE_' + k, ([k], ['Float'] * n)) for k, n in VECTORS.items()])
+
+NODE_KEYS = ('name', 'inputs', 'outputs')
+VERTEX_KEYS = ('node', 'name')
+
+
+def check_layout(data):
+    missing = ['"{}"'.format(x) for x in ('nodes', 'vertices') if x not in data]
+    if not missing:
+        missing += ['nodes[{}].{}'.format(i, y) for i, x in enumerate(data['nodes']) for y in NODE_KEYS if y not in x][:1]
+        missing += ['vertices[{}].{}'.format(i, y) for i, x in enumerate(data['vertices']) for y in VERTEX_KEYS if y not in x][:1]
+    if missing:
+        raise RuntimeError("[Nemo]GRAPH layout not recognized, missing {}".format(', '.join(missing)))
+
+
+def is_array(typename):
+    return typename.endswith('[]')
+
+
+def to_array(value, typename):
+    # literal of a port -> array without the frames axis
+    element = typename[:-2] if is_array(typename) else typename
+    value = np.asarray(value, dtype=bool if element == 'Bool' else int if element == 'Int' else float)
+    return value.reshape(value.shape[:-1] + (4, 4)) if element == 'Mat4' else value
+
+
+def apply_indices(node, args):
+    # masked array ports reach the ops as index tuple -> value
+    args = list(args)
+    for index, masks in node.indices.items():
+        args[index] = OrderedDict((tuple(x or ()), y) for x, y in zip(masks, args[index]))
+    return args
+
+
+def to_literal(value, typename):
+    value = np.asarray(value)
+    if typename in ('Mat4', 'Mat4[]'):
+        value = value.reshape(value.shape[:-2] + (16,))
+    return value.item() if value.ndim == 0 else value.tolist()
+
+
+class Node(object):
+    """
+    a vertex of the GRAPH: method is the name of its node, every port holds a variable (a list of them for
+    array ports) and indices keeps the element masks of array ports
+    """
+    __slots__ = ('name', 'method', 'inputs', 'outputs', 'indices')
+
+    def __init__(self, name, method, inputs, outputs, indices=None):
+        self.name = name
+        self.method = method
+        self.inputs = inputs
+        self.outputs = outputs
+        self.indices = indices or dict()
+
+    def __repr__(self):
+        return 'Node({}, {})'.format(self.name, self.method)
+
+    def list_inputs(self):
+        # every variable read by the node, array ports flattened
+        variables = []
+        for x in self.inputs:
+            if isinstance(x, list):
+                variables += x
+            else:
+                variables.append(x)
+        return variables
+
+
+class Graph(object):
+    """
+    inputs and outputs map the names of INPUT_/OUTPUT_ vertices to variables, values holds the literals,
+    resources the RESOURCE entries {"id", "type"} read by ports and elements the (variable, index) of array output
+    elements read by ports. types gives the port type of every variable.
+    """
+
+    def __init__(self, declarations=None, nodes=None, inputs=None, outputs=None, values=None, resources=None, elements=None,
+                 types=None, extras=None):
+        self.declarations = declarations or OrderedDict()
+        self.nodes = nodes or []
+        self.inputs = inputs or OrderedDict()
+        self.outputs = outputs or OrderedDict()
+        self.values = values or dict()
+        self.resources = resources or dict()
+        self.elements = elements or dict()
+        self.types = types or dict()
+        self.extras = extras or OrderedDict()
+
+    def get_signature(self, method):
+        # (input types, output types) of a node
+        if method in self.declarations:
+            x = self.declarations[method]
+            return [y['type'] for y in x['inputs']], [y['type'] for y in x['outputs']]
+        if method in BUILTINS:
+            return BUILTINS[method]
+        for header in (HEADER_INPUT, HEADER_OUTPUT):
+            if method.startswith(header):
+                typename = method[len(header):]
+                return [typename], [typename]
+        raise RuntimeError("[Nemo]GRAPH node {} is not declared".format(method))
+
+    @staticmethod
+    def from_dict(data):
+        check_layout(data)
+        graph = Graph(declarations=OrderedDict((x['name'], x) for x in data['nodes']),
+                      extras=OrderedDict((k, v) for k, v in data.items() if k not in ('nodes', 'vertices')))
+        signatures = [graph.get_signature(x['node']) for x in data['vertices']]
+        # variables 0..n are the vertex outputs, literals, resources and elements get the following ones
+        first = []
+        count = 0
+        for inputs, outputs in signatures:
+            first.append(count)
+            count += len(outputs)
+        for i, (inputs, outputs) in enumerate(signatures):
+            for j, typename in enumerate(outputs):
+                graph.types[first[i] + j] = typename
+
+        def read(value, typename):
+            if isinstance(value, dict) and 'vertex' in value:
+                inputs, returns = signatures[value['vertex']]
+                if not len(inputs) <= value['attribute'] < len(inputs) + len(returns):
+                    raise RuntimeError("[Nemo]vertex {} has no output attribute {}".format(value['vertex'], value['attribute']))
+                source = first[value['vertex']] + value['attribute'] - len(inputs)
+                if 'index' not in value:
+                    return source
+            variable = len(graph.types)
+            graph.types[variable] = typename
+            if isinstance(value, dict) and 'vertex' in value:
+                graph.elements[variable] = (source, list(value['index']))
+            elif isinstance(value, dict) and 'id' in value:
+                graph.resources[variable] = OrderedDict([('id', value['id']), ('type', value['type'])])
+            else:
+                graph.values[variable] = value
+            return variable
+
+        outputs = []
+        for i, x in enumerate(data['vertices']):
+            inputs, returns = signatures[i]
+            node = Node(x['name'], x['node'], [[] if is_array(t) else None for t in inputs],
+                        list(range(first[i], first[i] + len(returns))))
+            for attribute in x.get('attributes', []):
+                index = attribute['index']
+                if 'values' in attribute:
+                    element = inputs[index][:-2]
+                    node.inputs[index] = [read(y['value'], element) for y in attribute['values']]
+                    if any('index' in y for y in attribute['values']):
+                        node.indices[index] = [y.get('index') for y in attribute['values']]
+                else:
+                    node.inputs[index] = read(attribute['value'], inputs[index])
+            if x['node'].startswith(HEADER_INPUT):
+                graph.inputs[x['name']] = node.outputs[0]
+            elif x['node'].startswith(HEADER_OUTPUT):
+                outputs.append(node)
+            else:
+                if any(y is None for y in node.inputs):
+                    raise RuntimeError("[Nemo]vertex {} leaves input {} unset".format(
+                        x['name'], node.inputs.index(None)))
+                graph.nodes.append(node)
+        for node in outputs:
+            graph.outputs[node.name] = node.inputs[0]
+        return graph
+
+    def to_dict(self):
+        # vertices go inputs, nodes, outputs; the variables of removed nodes must not be read anymore
+        vertices = []
+        ports = dict()
+
+        def write(variable):
+            if variable in self.elements:
+                source, index = self.elements[variable]
+                if source not in ports:
+                    return to_literal(self.read_element(variable), self.types[variable])
+                value = write(source)
+                value['index'] = index
+                return value
+            if variable in ports:
+                return OrderedDict([('vertex', ports[variable][0]), ('attribute', ports[variable][1])])
+            if variable in self.resources:
+                return self.resources[variable]
+            if variable in self.values:
+                return to_literal(self.values[variable], self.types[variable])
+            raise RuntimeError("[Nemo]variable {} has no producer, value or resource".format(variable))
+
+        def add(name, method, inputs, indices=None):
+            attributes = []
+            for index, x in enumerate(inputs):
+                if isinstance(x, list):
+                    items = [OrderedDict([('value', write(y))]) for y in x]
+                    for item, mask in zip(items, (indices or {}).get(index, [])):
+                        if mask is not None:
+                            item['index'] = mask
+                    attributes.append(OrderedDict([('index', index), ('values', items)]))
+                else:
+                    attributes.append(OrderedDict([('index', index), ('value', write(x))]))
+            vertices.append(OrderedDict([('node', method), ('name', name), ('attributes', attributes)]))
+
+        for name, variable in self.inputs.items():
+            ports[variable] = (len(vertices), 1)
+            vertices.append(OrderedDict([('node', HEADER_INPUT + self.types[variable]), ('name', name), ('attributes', [])]))
+        for i in self.sort():
+            node = self.nodes[i]
+            count = len(self.get_signature(node.method)[0])
+            for j, x in enumerate(node.outputs):
+                ports[x] = (len(vertices), count + j)
+            add(node.name, node.method, node.inputs, node.indices)
+        for name, variable in self.outputs.items():
+            add(name, HEADER_OUTPUT + self.types[variable], [variable])
+        data = OrderedDict(self.extras)
+        data['nodes'] = list(self.declarations.values())
+        data['vertices'] = vertices
+        return data
+
+    def read_element(self, variable):
+        # element of a constant array output
+        source, index = self.elements[variable]
+        return to_array(self.values[source], self.types[source])[tuple(index)]
+
+    def list_producers(self):
+        # variable -> index of the node writing it, elements of array outputs included
+        producers = dict()
+        for i, node in enumerate(self.nodes):
+            for x in node.outputs:
+                producers[x] = i
+        for x, (source, _) in self.elements.items():
+            if source in producers:
+                producers[x] = producers[source]
+        return producers
+
+    def list_dependencies(self):
+        # node index -> sorted indices of the nodes it reads from
+        producers = self.list_producers()
+        return [sorted({producers[x] for x in node.list_inputs() if x in producers}) for node in self.nodes]
+
+    def sort(self):
+        """
+        returns node indices in an order where every node comes after the nodes it reads from
+        """
+        dependencies = self.list_dependencies()
+        consumers = [[] for _ in self.nodes]
+        pending = [len(x) for x in dependencies]
+        for i, x in enumerate(dependencies):
+            for j in x:
+                consumers[j].append(i)
+        order = [i for i, x in enumerate(pending) if not x]
+        for i in order:
+            for j in consumers[i]:
+                pending[j] -= 1
+                if not pending[j]:
+                    order.append(j)
+        if len(order) != len(self.nodes):
+            raise RuntimeError("[Nemo]graph has a cycle through {}".format(
+                ', '.join(self.nodes[i].name for i, x in enumerate(pending) if x)))
+        return order
+
+
+def load(path):
+    with open(path) as f:
+        return Graph.from_dict(json.load(f, object_pairs_hook=OrderedDict))
+
+
+def dump(graph, path):
+    with open(path, 'w') as f:
+        json.dump(graph.to_dict(), f)
@@ -0,0 +1,727 @@
+"""
+ Copyright (c) 2022 OctMedia
+
+ Permission is hereby granted, free of charge, to any person obtaining a copy of
+ this software and associated documentation files (the "Software"), to deal in
+ the Software without restriction, including without limitation the rights to
+ use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+ the Software, and to permit persons to whom the Software is furnished to do so,
+ subject to the following conditions:
+
+ The above copyright notice and this permission notice shall be included in all
+ copies or substantial portions of the Software.
+
+ THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+ FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+ COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+ IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+ CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+ """
+
+from functools import reduce
+
+import numpy as np
+
+# Batched implementations of the module spec methods. Every argument carries the frames as its first axis:
+# Float/Int/Bool (B,), Vec2/Vec3/Vec4 (B, n), Mat4 (B, 4, 4), Mesh/Curve points (B, points, 3),
+# stack parameters are lists of those, masked ones ([?] in the specs) dicts of index tuple -> value. RESOURCE entries
+# come as they are, without the frames axis. Angles are radians, matrices follow Maya's row-vector convention.
+# Matrix products go through multiply, mayapy 2.7 has no @ operator.
+
+OPS = dict()
+
+# rotateOrder enum: xyz, yzx, zxy, xzy, yxz, zyx
+ORDERS = [(0, 1, 2), (1, 2, 0), (2, 0, 1), (0, 2, 1), (1, 0, 2), (2, 1, 0)]
+
+
+def multiply(*matrices):
+    # left to right product of (B, 4, 4) stacks, so the first matrix applies first to row vectors
+    return reduce(np.matmul, matrices)
+
+
+def op(*names):
+    def register(func):
+        for name in names:
+            OPS[name] = func
+        return func
+    return register
+
+
+def identity(count):
+    return np.broadcast_to(np.eye(4), (count, 4, 4)).copy()
+
+
+def translation(t):
+    m = identity(len(t))
+    m[:, 3, :3] = t
+    return m
+
+
+def scaling(s):
+    m = identity(len(s))
+    m[:, 0, 0] = s[:, 0]
+    m[:, 1, 1] = s[:, 1]
+    m[:, 2, 2] = s[:, 2]
+    return m
+
+
+def shearing(sh):
+    m = identity(len(sh))
+    m[:, 1, 0] = sh[:, 0]
+    m[:, 2, 0] = sh[:, 1]
+    m[:, 2, 1] = sh[:, 2]
+    return m
+
+
+def axis_rotation(axis, angle):
+    m = identity(len(angle))
+    c, s = np.cos(angle), np.sin(angle)
+    i, j = [(1, 2), (2, 0), (0, 1)][axis]
+    m[:, i, i] = c
+    m[:, i, j] = s
+    m[:, j, i] = -s
+    m[:, j, j] = c
+    return m
+
+
+def euler_to_matrix(rotate, order=None):
+    axes = [axis_rotation(i, rotate[:, i]) for i in range(3)]
+    if order is None:
+        return multiply(axes[0], axes[1], axes[2])
+    order = np.asarray(order).astype(int)
+    result = identity(len(rotate))
+    for index, (i, j, k) in enumerate(ORDERS):
+        mask = order == index
+        if mask.any():
+            result[mask] = multiply(axes[i], axes[j], axes[k])[mask]
+    return result
+
+
+def matrix_to_euler(m, order=None):
+    # inverse of euler_to_matrix for the rotation part of m, rows must be normalized
+    order = np.zeros(len(m), dtype=int) if order is None else np.asarray(order).astype(int)
+    result = np.zeros((len(m), 3))
+    for index, (i, j, k) in enumerate(ORDERS):
+        mask = order == index
+        if not mask.any():
+            continue
+        sign = 1.0 if index < 3 else -1.0
+        r = m[mask]
+        result[mask, j] = np.arcsin(np.clip(-sign * r[:, i, k], -1.0, 1.0))
+        result[mask, i] = np.arctan2(sign * r[:, j, k], r[:, k, k])
+        result[mask, k] = np.arctan2(sign * r[:, i, j], r[:, i, i])
+    return result
+
+
+def normalize(v):
+    length = np.linalg.norm(v, axis=-1, keepdims=True)
+    return v / np.where(length == 0.0, 1.0, length)
+
+
+def decompose(m):
+    # m = S * Sh * R * T, returns translate, rotation matrix, scale and shear (xy, xz, yz)
+    rows = m[:, :3, :3]
+    sx = np.linalg.norm(rows[:, 0], axis=-1)
+    r0 = normalize(rows[:, 0])
+    xy = np.einsum('bi,bi->b', rows[:, 1], r0)
+    r1 = rows[:, 1] - xy[:, None] * r0
+    sy = np.linalg.norm(r1, axis=-1)
+    r1 = normalize(r1)
+    xz = np.einsum('bi,bi->b', rows[:, 2], r0)
+    yz = np.einsum('bi,bi->b', rows[:, 2], r1)
+    r2 = rows[:, 2] - xz[:, None] * r0 - yz[:, None] * r1
+    sz = np.linalg.norm(r2, axis=-1)
+    r2 = normalize(r2)
+    flip = np.linalg.det(rows) < 0
+    sz = np.where(flip, -sz, sz)
+    r2 = np.where(flip[:, None], -r2, r2)
+    rotation = identity(len(m))
+    rotation[:, 0, :3] = r0
+    rotation[:, 1, :3] = r1
+    rotation[:, 2, :3] = r2
+    safe = lambda x: np.where(x == 0.0, 1.0, x)
+    scale = np.stack([sx, sy, sz], axis=-1)
+    shear = np.stack([xy / safe(sy), xz / safe(sz), yz / safe(sz)], axis=-1)
+    return m[:, 3, :3].copy(), rotation, scale, shear
+
+
+def quat_to_matrix(q):
+    x, y, z, w = q[:, 0], q[:, 1], q[:, 2], q[:, 3]
+    m = identity(len(q))
+    m[:, 0, 0] = 1 - 2 * (y * y + z * z)
+    m[:, 0, 1] = 2 * (x * y + z * w)
+    m[:, 0, 2] = 2 * (x * z - y * w)
+    m[:, 1, 0] = 2 * (x * y - z * w)
+    m[:, 1, 1] = 1 - 2 * (x * x + z * z)
+    m[:, 1, 2] = 2 * (y * z + x * w)
+    m[:, 2, 0] = 2 * (x * z + y * w)
+    m[:, 2, 1] = 2 * (y * z - x * w)
+    m[:, 2, 2] = 1 - 2 * (x * x + y * y)
+    return m
+
+
+def matrix_to_quat(m):
+    r = m[:, :3, :3]
+    w = np.sqrt(np.maximum(0.0, 1 + r[:, 0, 0] + r[:, 1, 1] + r[:, 2, 2])) / 2
+    x = np.sqrt(np.maximum(0.0, 1 + r[:, 0, 0] - r[:, 1, 1] - r[:, 2, 2])) / 2
+    y = np.sqrt(np.maximum(0.0, 1 - r[:, 0, 0] + r[:, 1, 1] - r[:, 2, 2])) / 2
+    z = np.sqrt(np.maximum(0.0, 1 - r[:, 0, 0] - r[:, 1, 1] + r[:, 2, 2])) / 2
+    x = np.copysign(x, r[:, 1, 2] - r[:, 2, 1])
+    y = np.copysign(y, r[:, 2, 0] - r[:, 0, 2])
+    z = np.copysign(z, r[:, 0, 1] - r[:, 1, 0])
+    return np.stack([x, y, z, w], axis=-1)
+
+
+def transform_points(points, m, vector=False):
+    result = np.einsum('b...i,bij->b...j', points, m[:, :3, :3])
+    if not vector:
+        result = result + m[:, None, 3, :3] if points.ndim == 3 else result + m[:, 3, :3]
+    return result
+
+
+def rotation_only(m):
+    return decompose(m)[1]
+
+
+def weighted(values, weights):
+    weights = np.stack(weights, axis=-1)
+    total = weights.sum(axis=-1)
+    stacked = np.stack(values, axis=1)
+    shape = weights.shape + (1,) * (stacked.ndim - 2)
+    return (stacked * weights.reshape(shape)).sum(axis=1) / np.where(total == 0.0, 1.0, total).reshape(shape[:1] + shape[2:]), total
+
+
+@op('ConstructVec2', 'ConstructVec3', 'ConstructVec4')
+def op_construct(*components):
+    return np.stack(components, axis=-1)
+
+
+@op('DECOMPOSE_Vec2', 'DECOMPOSE_Vec3', 'DECOMPOSE_Vec4')
+def op_decompose_vector(vector):
+    return tuple(vector[:, i] for i in range(vector.shape[-1]))
+
+
+@op('transform')
+def op_transform(translate, rotate, rotate_order, scale, shear, rotate_pivot, scale_pivot, rotate_pivot_translate, scale_pivot_translate):
+    return multiply(translation(-scale_pivot), scaling(scale), shearing(shear), translation(scale_pivot + scale_pivot_translate),
+                    translation(-rotate_pivot), euler_to_matrix(rotate, rotate_order), translation(rotate_pivot + rotate_pivot_translate),
+                    translation(translate))
+
+
+@op('joint')
+def op_joint(translate, rotate, scale, rotate_order, joint_orient, inverse_scale, segment_scale_compensate):
+    inverse = np.where(segment_scale_compensate[:, None], 1.0 / np.where(inverse_scale == 0.0, 1.0, inverse_scale), 1.0)
+    return multiply(scaling(scale), euler_to_matrix(rotate, rotate_order), euler_to_matrix(joint_orient), scaling(inverse),
+                    translation(translate))
+
+
+@op('inverseLocal', 'inverseWorld', 'inverseMatrix')
+def op_inverse(matrix):
+    return np.linalg.inv(matrix)
+
+
+@op('worldMatrix')
+def op_world_matrix(parent_world, matrix):
+    return np.matmul(matrix, parent_world)
+
+
+@op('worldVisibility')
+def op_world_visibility(visibility, parent_visibility):
+    return np.logical_and(visibility, parent_visibility)
+
+
+@op('worldMesh', 'worldCurve', 'worldSurface', 'worldLattice')
+def op_world_points(points, world):
+    return transform_points(points, world)
+
+
+@op('curve_from_cv', 'curve_from_bezier')
+def op_curve_from_cv(*args):
+    return np.stack(args[-1], axis=1)
+
+
+@op('locatorWorldPosition')
+def op_locator_world_position(position, world):
+    return transform_points(position, world)
+
+
+@op('addDoubleLinear')
+def op_add_double_linear(a, b):
+    return a + b
+
+
+@op('multDoubleLinear')
+def op_mult_double_linear(a, b):
+    return a * b
+
+
+@op('unitConversion1D', 'unitConversion1DInt', 'unitConversion2D', 'unitConversion3D')
+def op_unit_conversion(value, factor):
+    value = np.asarray(value, dtype=float)
+    return value * factor.reshape(factor.shape + (1,) * (value.ndim - 1))
+
+
+@op('reverse')
+def op_reverse(value):
+    return 1.0 - value
+
+
+@op('blendColors')
+def op_blend_colors(color1, color2, blender):
+    return color1 * blender[:, None] + color2 * (1.0 - blender[:, None])
+
+
+@op('blendTwoAttr')
+def op_blend_two_attr(inputs, blender):
+    if len(inputs) == 1:
+        return inputs[0]
+    return inputs[0] * (1.0 - blender) + inputs[1] * blender
+
+
+@op('blendWeighted')
+def op_blend_weighted(inputs, weights):
+    return sum(x * w for x, w in zip(inputs, weights))
+
+
+@op('choice')
+def op_choice(inputs, selector):
+    return np.choose(np.clip(selector.astype(int), 0, len(inputs) - 1), inputs)
+
+
+@op('clamp')
+def op_clamp(value, low, high):
+    return np.where(value < low, low, np.where(value > high, high, value))
+
+
+@op('combinationShape')
+def op_combination_shape(weights, method):
+    stacked = np.stack(weights, axis=-1)
+    return np.where(method == 1, stacked.min(axis=-1), stacked.prod(axis=-1))
+
+
+def compare(first, second, operation):
+    operation = operation.astype(int)
+    results = [first == second, first != second, first > second, first >= second, first < second, first <= second]
+    return np.choose(np.clip(operation, 0, 5), results)
+
+
+@op('condition1D')
+def op_condition_1d(first, second, if_true, if_false, operation):
+    return np.where(compare(first, second, operation), if_true, if_false)
+
+
+@op('condition3D')
+def op_condition_3d(first, second, if_true, if_false, operation):
+    return np.where(compare(first, second, operation)[:, None], if_true, if_false)
+
+
+@op('distanceBetweenTwoPoints', 'distanceDimShape')
+def op_distance_points(a, b):
+    return np.linalg.norm(b - a, axis=-1)
+
+
+@op('distanceBetweenTwoMatrices')
+def op_distance_matrices(a, b):
+    return np.linalg.norm(b[:, 3, :3] - a[:, 3, :3], axis=-1)
+
+
+@op('multMatrix')
+def op_mult_matrix(matrices):
+    return multiply(*matrices)
+
+
+def multiply_divide(a, b, operation):
+    operation = operation.reshape(operation.shape + (1,) * (a.ndim - 1)).astype(int)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        divided = np.where(b == 0.0, 0.0, a / np.where(b == 0.0, 1.0, b))
+        power = np.power(a, b)
+    return np.where(operation == 1, a * b, np.where(operation == 2, divided, np.where(operation == 3, power, a)))
+
+
+@op('multiplyDivide1D', 'multiplyDivide3D')
+def op_multiply_divide(a, b, operation):
+    return multiply_divide(a, b, operation)
+
+
+@op('plusMinusAverage1D', 'plusMinusAverage2D', 'plusMinusAverage3D')
+def op_plus_minus_average(inputs, operation):
+    if not inputs:
+        return np.zeros_like(operation, dtype=float)
+    stacked = np.stack(inputs, axis=1)
+    operation = operation.reshape(operation.shape + (1,) * (stacked.ndim - 2)).astype(int)
+    total = stacked.sum(axis=1)
+    subtract = stacked[:, 0] - stacked[:, 1:].sum(axis=1)
+    return np.where(operation == 1, total, np.where(operation == 2, subtract, np.where(operation == 3, total / len(inputs), stacked[:, 0])))
+
+
+@op('pairBlendTranslate1D')
+def op_pair_blend_translate_1d(a, b, weight, mode):
+    return a * (1.0 - weight) + b * weight
+
+
+@op('pairBlendTranslate3D')
+def op_pair_blend_translate_3d(a, b, weight, mode_x, mode_y, mode_z):
+    return a * (1.0 - weight[:, None]) + b * weight[:, None]
+
+
+def slerp(q0, q1, weight):
+    dot = np.einsum('bi,bi->b', q0, q1)
+    q1 = np.where(dot[:, None] < 0, -q1, q1)
+    dot = np.abs(dot)
+    theta = np.arccos(np.clip(dot, -1.0, 1.0))
+    sin = np.sin(theta)
+    small = sin < 1e-6
+    safe = np.where(small, 1.0, sin)
+    w0 = np.where(small, 1.0 - weight, np.sin((1.0 - weight) * theta) / safe)
+    w1 = np.where(small, weight, np.sin(weight * theta) / safe)
+    return normalize(q0 * w0[:, None] + q1 * w1[:, None])
+
+
+@op('pairBlendRotate')
+def op_pair_blend_rotate(a, b, weight, interpolation):
+    linear = a * (1.0 - weight[:, None]) + b * weight[:, None]
+    q = slerp(matrix_to_quat(euler_to_matrix(a)), matrix_to_quat(euler_to_matrix(b)), weight)
+    return np.where(interpolation[:, None] == 1, matrix_to_euler(quat_to_matrix(q)), linear)
+
+
+@op('pointMatrixMult')
+def op_point_matrix_mult(point, matrix, vector):
+    return np.where(vector[:, None], transform_points(point, matrix, True), transform_points(point, matrix))
+
+
+@op('setRange1D', 'setRange3D')
+def op_set_range(value, old_min, old_max, new_min, new_max):
+    span = old_max - old_min
+    ratio = np.where(span == 0.0, 0.0, (value - old_min) / np.where(span == 0.0, 1.0, span))
+    return new_min + ratio * (new_max - new_min)
+
+
+@op('angleBetween__COMPUTE__angle')
+def op_angle_between(a, b):
+    return np.arccos(np.clip(np.einsum('bi,bi->b', normalize(a), normalize(b)), -1.0, 1.0))
+
+
+@op('angleBetween__COMPUTE__axis')
+def op_angle_between_axis(a, b):
+    return normalize(np.cross(a, b))
+
+
+@op('composeMatrix')
+def op_compose_matrix(translate, rotate, rotate_order, scale):
+    return multiply(scaling(scale), euler_to_matrix(rotate, rotate_order), translation(translate))
+
+
+@op('decomposeMatrixTranslate')
+def op_decompose_translate(matrix):
+    return matrix[:, 3, :3].copy()
+
+
+@op('decomposeMatrixRotate')
+def op_decompose_rotate(matrix):
+    return matrix_to_euler(rotation_only(matrix))
+
+
+@op('decomposeMatrixScale')
+def op_decompose_scale(matrix):
+    return decompose(matrix)[2]
+
+
+@op('decomposeMatrixShear')
+def op_decompose_shear(matrix):
+    return decompose(matrix)[3]
+
+
+@op('decomposeMatrixQuat')
+def op_decompose_quat(matrix):
+    return matrix_to_quat(rotation_only(matrix))
+
+
+@op('quatToEuler')
+def op_quat_to_euler(quat):
+    return matrix_to_euler(quat_to_matrix(normalize(quat)))
+
+
+def interpolate_keys(x, times, values, out_slopes, in_slopes, step):
+    # cubic hermite between keys, constant outside of them
+    times = np.stack(times, axis=-1)
+    values = np.stack(values, axis=-1)
+    count = times.shape[-1]
+    if count == 1:
+        return values[:, 0]
+    index = np.clip(np.array([np.searchsorted(t, v, side='right') for t, v in zip(times, x)]) - 1, 0, count - 2)
+    rows = np.arange(len(x))
+    t0, t1 = times[rows, index], times[rows, index + 1]
+    v0, v1 = values[rows, index], values[rows, index + 1]
+    span = np.where(t1 == t0, 1.0, t1 - t0)
+    s = np.clip((x - t0) / span, 0.0, 1.0)
+    m0 = np.stack(out_slopes, axis=-1)[rows, index] * span
+    m1 = np.stack(in_slopes, axis=-1)[rows, index + 1] * span
+    s2, s3 = s * s, s * s * s
+    result = (2 * s3 - 3 * s2 + 1) * v0 + (s3 - 2 * s2 + s) * m0 + (-2 * s3 + 3 * s2) * v1 + (s3 - s2) * m1
+    result = np.where(np.stack(step, axis=-1)[rows, index], v0, result)
+    result = np.where(x <= times[:, 0], values[:, 0], result)
+    return np.where(x >= times[:, -1], values[:, -1], result)
+
+
+def slopes(xs, ys):
+    return [np.where(x == 0.0, 0.0, y / np.where(x == 0.0, 1.0, x)) for x, y in zip(xs, ys)]
+
+
+@op('animCurve')
+def op_anim_curve(x, times, values, in_x, in_y, in_type, out_x, out_y, out_type, pre_infinity, post_infinity, weighted_tangents):
+    # tangents are used as slopes (unweighted), step tangents (type 5) hold the key value, infinity is constant
+    if not times:
+        return np.zeros_like(x)
+    return interpolate_keys(x, times, values, slopes(out_x, out_y), slopes(in_x, in_y), [t == 5 for t in out_type])
+
+
+@op('remapValue')
+def op_remap_value(value, input_min, input_max, output_min, output_max, positions, values, interps):
+    span = input_max - input_min
+    x = np.where(span == 0.0, 0.0, (value - input_min) / np.where(span == 0.0, 1.0, span))
+    if not positions:
+        f = x
+    else:
+        order = np.argsort(np.stack(positions, axis=-1), axis=-1)
+        rows = np.arange(len(x))[:, None]
+        times = np.stack(positions, axis=-1)[rows, order]
+        ys = np.stack(values, axis=-1)[rows, order]
+        kinds = np.stack(interps, axis=-1)[rows, order]
+        count = times.shape[-1]
+        index = np.clip(np.array([np.searchsorted(t, v, side='right') for t, v in zip(times, x)]) - 1, 0, max(count - 2, 0))
+        r = rows[:, 0]
+        if count == 1:
+            f = ys[:, 0]
+        else:
+            t0, t1 = times[r, index], times[r, index + 1]
+            s = np.clip((x - t0) / np.where(t1 == t0, 1.0, t1 - t0), 0.0, 1.0)
+            kind = kinds[r, index]
+            s = np.where(kind == 0, 0.0, np.where(kind == 1, s, s * s * (3 - 2 * s)))
+            f = ys[r, index] + (ys[r, index + 1] - ys[r, index]) * s
+            f = np.where(x <= times[:, 0], ys[:, 0], np.where(x >= times[:, -1], ys[:, -1], f))
+    return output_min + f * (output_max - output_min)
+
+
+@op('pointConstraint')
+def op_point_constraint(parent_inverse, rotate_pivot, rotate_translate, offset, weights, rest, target_parents, target_translates, target_pivots):
+    world = [transform_points(t + p, m) for t, m, p in zip(target_translates, target_parents, target_pivots)]
+    if not world:
+        return rest
+    position, total = weighted(world, weights)
+    local = transform_points(position, parent_inverse) - rotate_pivot - rotate_translate + offset
+    return np.where(total[:, None] == 0.0, rest, local)
+
+
+@op('scaleConstraint')
+def op_scale_constraint(parent_inverse, compensate, offset, weights, rest, target_parents, target_scales):
+    world = [decompose(np.matmul(scaling(s), m))[2] for s, m in zip(target_scales, target_parents)]
+    if not world:
+        return rest
+    scale, total = weighted(world, weights)
+    local = decompose(np.matmul(scaling(scale), parent_inverse))[2] * offset
+    return np.where(total[:, None] == 0.0, rest, local)
+
+
+def average_rotation(rotations, weights):
+    quats = [matrix_to_quat(x) for x in rotations]
+    aligned = [np.where(np.einsum('bi,bi->b', quats[0], q)[:, None] < 0, -q, q) for q in quats]
+    quat, total = weighted(aligned, weights)
+    return quat_to_matrix(normalize(quat)), total
+
+
+@op('orientConstraint')
+def op_orient_constraint(parent_inverse, rotate_order, joint_orient, offset, interp_type, weights, rest, target_parents,
+                         target_rotates, target_orders, target_orients):
+    world = [multiply(euler_to_matrix(r, o), euler_to_matrix(jo), rotation_only(m))
+             for r, o, jo, m in zip(target_rotates, target_orders, target_orients, target_parents)]
+    if not world:
+        return rest
+    rotation, total = average_rotation(world, weights)
+    local = multiply(euler_to_matrix(offset), rotation, rotation_only(parent_inverse), np.linalg.inv(euler_to_matrix(joint_orient)))
+    return np.where(total[:, None] == 0.0, rest, matrix_to_euler(local, rotate_order))
+
+
+@op('parentConstraintTranslate')
+def op_parent_constraint_translate(parent_inverse, rotate_pivot, rotate_translate, weights, rest, target_parents, target_translates,
+                                   target_offsets, target_pivots, target_rotates, target_orders, target_scales, target_inverse_scales,
+                                   target_compensates, target_orients):
+    # the offset is a point in the space of the target, rotating and scaling about its pivot
+    world = []
+    for i, m in enumerate(target_parents):
+        inverse = np.where(target_compensates[i][:, None], 1.0 / np.where(target_inverse_scales[i] == 0.0, 1.0, target_inverse_scales[i]), 1.0)
+        target = multiply(scaling(target_scales[i]), euler_to_matrix(target_rotates[i], target_orders[i]), euler_to_matrix(target_orients[i]),
+                          scaling(inverse), translation(target_translates[i] + target_pivots[i]), m)
+        world.append(transform_points(target_offsets[i], target))
+    if not world:
+        return rest
+    position, total = weighted(world, weights)
+    local = transform_points(position, parent_inverse) - rotate_pivot - rotate_translate
+    return np.where(total[:, None] == 0.0, rest, local)
+
+
+@op('parentConstraintRotate')
+def op_parent_constraint_rotate(parent_inverse, rotate_order, joint_orient, interp_type, weights, rest, target_parents, target_rotates,
+                                target_offsets, target_orders, target_orients):
+    world = [multiply(euler_to_matrix(offset), euler_to_matrix(r, o), euler_to_matrix(jo), rotation_only(m))
+             for r, offset, o, jo, m in zip(target_rotates, target_offsets, target_orders, target_orients, target_parents)]
+    if not world:
+        return rest
+    rotation, total = average_rotation(world, weights)
+    local = multiply(rotation, rotation_only(parent_inverse), np.linalg.inv(euler_to_matrix(joint_orient)))
+    return np.where(total[:, None] == 0.0, rest, matrix_to_euler(local, rotate_order))
+
+
+def frame(aim, up):
+    # rows aim, up made orthogonal to aim, their cross product
+    aim = normalize(aim)
+    up = normalize(up - np.einsum('bi,bi->b', up, aim)[:, None] * aim)
+    m = identity(len(aim))
+    m[:, 0, :3] = aim
+    m[:, 1, :3] = up
+    m[:, 2, :3] = np.cross(aim, up)
+    return m
+
+
+def shortest_arc(a, b):
+    # rotation taking the direction a to b
+    a, b = normalize(a), normalize(b)
+    return quat_to_matrix(normalize(np.concatenate([np.cross(a, b), 1.0 + np.einsum('bi,bi->b', a, b)[:, None]], axis=-1)))
+
+
+@op('aimConstraint')
+def op_aim_constraint(parent_inverse, translate, rotate_pivot, rotate_translate, rotate_order, joint_orient, offset, weights, rest,
+                      target_parents, target_translates, target_pivots, world_up_type, world_up_matrix, world_up_vector, up_vector,
+                      aim_vector):
+    # worldUpType: scene up, object up, object rotation up, vector, none
+    world = [transform_points(t + p, m) for t, m, p in zip(target_translates, target_parents, target_pivots)]
+    if not world:
+        return rest
+    target, total = weighted(world, weights)
+    position = transform_points(translate + rotate_pivot + rotate_translate, np.linalg.inv(parent_inverse))
+    aim = target - position
+    kind = world_up_type.astype(int)[:, None]
+    up = np.where(kind == 0, np.array([0.0, 1.0, 0.0]), world_up_vector)
+    up = np.where(kind == 1, world_up_matrix[:, 3, :3] - position, up)
+    up = np.where(kind == 2, transform_points(world_up_vector, world_up_matrix, True), up)
+    # rows of the constrained axes times the rotation give the world axes, frames are orthonormal
+    aligned = multiply(np.transpose(frame(aim_vector, up_vector), (0, 2, 1)), frame(aim, up))
+    rotation = np.where((kind == 4)[:, :, None], shortest_arc(aim_vector, aim), aligned)
+    local = multiply(euler_to_matrix(offset), rotation, rotation_only(parent_inverse), np.linalg.inv(euler_to_matrix(joint_orient)))
+    return np.where(total[:, None] == 0.0, rest, matrix_to_euler(local, rotate_order))
+
+
+@op('poleVectorConstraint')
+def op_pole_vector_constraint(parent_inverse, rotate_pivot, pivot_space, target_parent, target_translate, target_pivot):
+    # the pole relative to the start of the chain, in the parent space of the ik handle
+    pole = transform_points(target_translate + target_pivot, target_parent)
+    return transform_points(pole - transform_points(rotate_pivot, pivot_space), parent_inverse, True)
+
+
+@op('weightDriverOutWeight')
+def op_weight_driver_out_weight(driver, reader, angle, invert):
+    # vector angle mode: weight falls off linearly with the angle between the X axes, angle is in degrees
+    cosine = np.einsum('bi,bi->b', normalize(driver[:, 0, :3]), normalize(reader[:, 0, :3]))
+    weight = np.clip(1.0 - np.arccos(np.clip(cosine, -1.0, 1.0)) / np.radians(np.where(angle == 0.0, 1.0, angle)), 0.0, 1.0)
+    return np.where(invert, 1.0 - weight, weight)
+
+
+def interpolate_poses(distances, values):
+    # gaussian RBF, distances are ((B, poses, poses) between the poses, (B, poses) from the input), values
+    # (B, poses, outputs); the width is the mean distance between poses
+    between, current = distances
+    count = between.shape[-1]
+    width = between.sum(axis=(1, 2)) / max(count * (count - 1), 1)
+    width = np.where(width == 0.0, 1.0, width)[:, None, None]
+    kernel = np.exp(-(between / width) ** 2)
+    solved = np.matmul(np.linalg.pinv(kernel), values)
+    return np.einsum('bp,bpo->bo', np.exp(-(current / width[:, :, 0]) ** 2), solved)
+
+
+def dense(items, count):
+    # masked stack {(pose, element): value} -> (B, poses, elements)
+    poses = sorted({k[0] for k in items})
+    rows = dict((x, i) for i, x in enumerate(poses))
+    size = max(k[1] for k in items) + 1 if items else 0
+    result = np.zeros((count, len(poses), size))
+    for k, v in items.items():
+        result[:, rows[k[0]], k[1]] = v
+    return result
+
+
+@op('weightDriverPoses')
+def op_weight_driver_poses(kind, rbf_mode, inputs, pose_inputs, pose_values):
+    count = len(kind)
+    x = np.stack(inputs, axis=-1) if inputs else np.zeros((count, 0))
+    poses = dense(pose_inputs, count)[:, :, :x.shape[-1]]
+    values = dense(pose_values, count)
+    if not poses.shape[1]:
+        return np.zeros((count, values.shape[-1]))
+    between = np.linalg.norm(poses[:, :, None] - poses[:, None], axis=-1)
+    current = np.linalg.norm(poses - x[:, None], axis=-1)
+    return interpolate_poses((between, current), values)
+
+
+def swing_twist(a, b, axis):
+    # (swing, twist) angles between two rotations (..., 4, 4) around the twist axis
+    swing = np.einsum('...i,...i->...', a[..., axis, :3], b[..., axis, :3])
+    relative = np.matmul(a, np.swapaxes(b, -1, -2))
+    shape = relative.shape[:-2]
+    q = matrix_to_quat(relative.reshape((-1, 4, 4))).reshape(shape + (4,))
+    twist = 2.0 * np.arctan2(np.abs(q[..., axis]), np.abs(q[..., 3]))
+    return np.arccos(np.clip(swing, -1.0, 1.0)), twist
+
+
+@op('weightDriverDrivers')
+def op_weight_driver_drivers(kind, rbf_mode, twist_axis, opposite, driver, parent_inverse, pose_matrices, pose_parents, pose_modes):
+    # matrix mode: every pose drives its own output, poseMode 0 swing and twist, 1 swing, 2 twist. Angles don't
+    # depend on the sign of the twist axis, so opposite changes nothing here
+    count = len(driver)
+    if not pose_matrices:
+        return np.zeros((count, 0))
+    axis = int(twist_axis[0])
+    current = rotation_only(np.matmul(driver, parent_inverse))
+    poses = np.stack([rotation_only(np.matmul(m, p)) for m, p in zip(pose_matrices, pose_parents)], axis=1)
+    modes = np.stack(pose_modes, axis=-1).astype(int)
+
+    def distance(swing, twist, mode):
+        return np.where(mode == 1, swing, np.where(mode == 2, twist, swing + twist))
+    between = distance(*swing_twist(poses[:, :, None], poses[:, None], axis), mode=modes[:, None])
+    current = distance(*swing_twist(current[:, None], poses, axis), mode=modes)
+    return interpolate_poses((between, current), np.broadcast_to(np.eye(poses.shape[1]), (count,) + between.shape[1:]))
+
+
+@op('clusterFull')
+def op_cluster(points, matrix, bind_pre_matrix, angle_interpolation, weights, *transform):
+    # the handle channels only make the node depend on them, matrix already carries them
+    scale = np.ones(points.shape[:2])
+    if isinstance(weights, dict):
+        for k, v in weights.items():
+            scale[:, k[0]] = v
+    elif weights:
+        scale[:, :len(weights)] = np.stack(weights, axis=-1)
+    deformed = transform_points(points, multiply(bind_pre_matrix, matrix))
+    return points + (deformed - points) * scale[:, :, None]
+
+
+@op('skin')
+def op_skin(envelope, points, geom_matrix, matrices, *custom):
+    """
+    the parser adds the bindPreMatrix (Mat4[]) and the weights RESOURCE entry, rows of (weight, influence, point)
+    """
+    bind = np.stack([x for x in custom if isinstance(x, list)][0], axis=1)
+    table = [x for x in custom if not isinstance(x, list)][0]
+    weights = np.zeros((points.shape[1], len(matrices)))
+    np.add.at(weights, (table['point'], table['influence']), table['weight'])
+    influences = np.stack(matrices, axis=1)
+    # per influence matrices are built once per frame, blended per vertex with the weights, then applied as 3x4
+    skinning = multiply(geom_matrix[:, None], bind, influences, np.linalg.inv(geom_matrix)[:, None])[:, :, :, :3]
+    blended = np.einsum('vj,bjkl->bvkl', weights, skinning)
+    deformed = np.einsum('bvk,bvkl->bvl', points, blended[:, :, :3]) + blended[:, :, 3]
+    return points + (deformed - points) * envelope[:, None, None]
+
+
+@op('blendShape')
+def op_blend_shape(envelope, points, weights, targets):
+    delta = sum(w[:, None, None] * (t - points) for w, t in zip(weights, targets)) if targets else 0.0
+    return points + delta * envelope[:, None, None]
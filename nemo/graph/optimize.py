@@ -0,0 +1,162 @@
+"""
+ Copyright (c) 2022 OctMedia
+
+ Permission is hereby granted, free of charge, to any person obtaining a copy of
+ this software and associated documentation files (the "Software"), to deal in
+ the Software without restriction, including without limitation the rights to
+ use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+ the Software, and to permit persons to whom the Software is furnished to do so,
+ subject to the following conditions:
+
+ The above copyright notice and this permission notice shall be included in all
+ copies or substantial portions of the Software.
+
+ THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+ FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+ COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+ IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+ CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+ """
+
+import json
+from collections import OrderedDict, Counter
+
+import numpy as np
+
+from nemo.graph import graph as graph_module
+from nemo.graph.ops import OPS
+
+# GRAPH JSON passes; vertex names and RESOURCE ids are kept, so the RESOURCE of the graph stays valid
+
+# methods whose ops compute exactly what Maya does; the others (animCurve, remapValue, pairBlend, constraints,
+# setRange, unitConversion1DInt...) approximate it and are never folded
+FOLDABLE = {
+    'addDoubleLinear', 'multDoubleLinear', 'reverse', 'clamp', 'blendColors',
+    'unitConversion1D', 'unitConversion2D', 'unitConversion3D',
+    'multiplyDivide1D', 'multiplyDivide3D', 'plusMinusAverage1D', 'plusMinusAverage2D', 'plusMinusAverage3D',
+    'condition1D', 'condition3D',
+    'multMatrix', 'composeMatrix', 'inverseMatrix', 'inverseLocal', 'inverseWorld', 'worldMatrix', 'transform', 'joint',
+    'ConstructVec2', 'ConstructVec3', 'ConstructVec4', 'DECOMPOSE_Vec2', 'DECOMPOSE_Vec3', 'DECOMPOSE_Vec4',
+}
+
+
+def fold_constants(graph, ops=None, methods=None):
+    """
+    evaluates the nodes of the given methods (FOLDABLE by default) that only read constants and turns their outputs
+    into constants. returns the folded nodes and the ones that failed to evaluate, which are kept
+    """
+    ops = ops or OPS
+    methods = FOLDABLE if methods is None else methods
+    folded = []
+    failed = []
+    values = dict()
+
+    def is_constant(x):
+        return x in graph.values or x in graph.elements and graph.elements[x][0] in graph.values
+
+    def read(x):
+        if isinstance(x, list):
+            return [read(y) for y in x]
+        if x not in values:
+            if x in graph.elements:
+                source, index = graph.elements[x]
+                values[x] = read(source)[(slice(None),) + tuple(index)]
+            else:
+                values[x] = graph_module.to_array(graph.values[x], graph.types[x])[None]
+        return values[x]
+
+    for i in graph.sort():
+        node = graph.nodes[i]
+        if node.method not in methods or node.method not in ops:
+            continue
+        # input-less nodes may hold state the graph doesn't show
+        variables = node.list_inputs()
+        if not variables or not all(is_constant(x) for x in variables):
+            continue
+        try:
+            results = ops[node.method](*graph_module.apply_indices(node, [read(x) for x in node.inputs]))
+        except Exception as e:
+            failed.append((node, '{}: {}'.format(type(e).__name__, e)))
+            continue
+        if len(node.outputs) == 1:
+            results = (results,)
+        for index, value in zip(node.outputs, results):
+            values[index] = value
+            graph.values[index] = graph_module.to_literal(value[0], graph.types[index])
+        folded.append(i)
+
+    removed = [graph.nodes[i] for i in folded]
+    folded = set(folded)
+    graph.nodes = [x for i, x in enumerate(graph.nodes) if i not in folded]
+    return removed, failed
+
+
+def remove_dead_nodes(graph):
+    """
+    drops the nodes none of the outputs depend on, then the constants no node reads anymore
+    """
+    producers = graph.list_producers()
+    alive = set()
+    pending = [producers[x] for x in graph.outputs.values() if x in producers]
+    while pending:
+        i = pending.pop()
+        if i in alive:
+            continue
+        alive.add(i)
+        pending += [producers[x] for x in graph.nodes[i].list_inputs() if x in producers]
+    removed = [x for i, x in enumerate(graph.nodes) if i not in alive]
+    graph.nodes = [x for i, x in enumerate(graph.nodes) if i in alive]
+
+    used = {x for node in graph.nodes for x in node.list_inputs()} | set(graph.outputs.values())
+    graph.elements = {k: v for k, v in graph.elements.items() if k in used}
+    used |= {x for x, _ in graph.elements.values()}
+    graph.values = {k: v for k, v in graph.values.items() if k in used}
+    graph.resources = {k: v for k, v in graph.resources.items() if k in used}
+    return removed
+
+
+def optimize(graph, ops=None):
+    """
+    folds static subgraphs and removes dead nodes in place, returns the report
+    """
+    before = Counter(x.method for x in graph.nodes)
+    folded, failed = fold_constants(graph, ops)
+    dead = remove_dead_nodes(graph)
+    after = Counter(x.method for x in graph.nodes)
+    return OrderedDict([
+        ('nodes_before', sum(before.values())),
+        ('nodes_after', sum(after.values())),
+        ('folded', [x.name for x in folded]),
+        ('dead', [x.name for x in dead]),
+        ('failed', OrderedDict((x.name, message) for x, message in failed)),
+        ('methods', OrderedDict((k, [before[k], after[k]]) for k in sorted(before))),
+    ])
+
+
+def format_report(report):
+    lines = ['nodes: {} -> {} ({} folded, {} dead)'.format(
+        report['nodes_before'], report['nodes_after'], len(report['folded']), len(report['dead']))]
+    for name, (before, after) in report['methods'].items():
+        if before != after:
+            lines.append('  {}: {} -> {}'.format(name, before, after))
+    for name, message in report['failed'].items():
+        lines.append('  kept {}, failed to fold: {}'.format(name, message))
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="fold constants and remove dead nodes of a GRAPH JSON")
+    parser.add_argument('graph')
+    parser.add_argument('output')
+    parser.add_argument('--report', help="path of the JSON report")
+    args = parser.parse_args()
+
+    graph = graph_module.load(args.graph)
+    report = optimize(graph)
+    graph_module.dump(graph, args.output)
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f)
+    print(format_report(report))
@@ -0,0 +1,83 @@
+"""
+ Copyright (c) 2022 OctMedia
+
+ Permission is hereby granted, free of charge, to any person obtaining a copy of
+ this software and associated documentation files (the "Software"), to deal in
+ the Software without restriction, including without limitation the rights to
+ use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+ the Software, and to permit persons to whom the Software is furnished to do so,
+ subject to the following conditions:
+
+ The above copyright notice and this permission notice shall be included in all
+ copies or substantial portions of the Software.
+
+ THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+ FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+ COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+ IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+ CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+ """
+
+
+import struct
+
+import numpy as np
+
+# <id>__RESOURCE.nemodata as written by Resource::dump in libNemoGraph: the entry count n (uint64), n + 1 uint64
+# offsets, then the entries back to back. Only the differences between offsets are sizes, the first one isn't the
+# file position. GRAPH ports read entry <id> as {"id": <id>, "type": "<type>"}, type naming the C++ container.
+
+# container -> numpy dtype of an element, in memory order; libstdc++ lays tuples out last element first
+DTYPES = {
+    'std::vector<unsigned>': np.dtype('<u4'),
+    'std::vector<uint8_t>': np.dtype('u1'),
+    'std::vector<std::pair<unsigned, glm::vec3>>': np.dtype([('index', '<u4'), ('value', '<f4', 3)]),
+    'std::vector<std::tuple<unsigned, unsigned, float>>': np.dtype([('weight', '<f4'), ('influence', '<u4'), ('point', '<u4')]),
+}
+
+
+class Resource(object):
+    """
+    entries of a RESOURCE, raw bytes by id
+
+        resource = Resource.load('Hero__RESOURCE.nemodata')
+        weights = resource.get(3, 'std::vector<std::tuple<unsigned, unsigned, float>>')
+    """
+
+    def __init__(self, entries=None):
+        self.entries = entries or []
+
+    def add(self, data):
+        self.entries.append(bytes(data))
+        return len(self.entries) - 1
+
+    def get(self, index, typename):
+        if index >= len(self.entries):
+            raise KeyError("[Nemo]RESOURCE has no entry {}".format(index))
+        if typename not in DTYPES:
+            raise RuntimeError("[Nemo]RESOURCE entries of type {} can't be read offline".format(typename))
+        return np.frombuffer(self.entries[index], dtype=DTYPES[typename])
+
+    @staticmethod
+    def load(path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        count, = struct.unpack_from('<Q', data)
+        offsets = struct.unpack_from('<{}Q'.format(count + 1), data, 8)
+        start = 8 * (count + 2)
+        entries = []
+        for i in range(count):
+            begin, end = offsets[i] - offsets[0], offsets[i + 1] - offsets[0]
+            entries.append(data[start + begin:start + end])
+        return Resource(entries)
+
+    def dump(self, path):
+        # same offsets as Resource::dump, starting at the entry count + 8
+        offsets = [len(self.entries) + 8]
+        for x in self.entries:
+            offsets.append(offsets[-1] + len(x))
+        with open(path, 'wb') as f:
+            f.write(struct.pack('<{}Q'.format(len(offsets) + 1), len(self.entries), *offsets))
+            for x in self.entries:
+                f.write(x)
@@ -0,0 +1,155 @@
+"""
+ Copyright (c) 2022 OctMedia
+
+ Permission is hereby granted, free of charge, to any person obtaining a copy of
+ this software and associated documentation files (the "Software"), to deal in
+ the Software without restriction, including without limitation the rights to
+ use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+ the Software, and to permit persons to whom the Software is furnished to do so,
+ subject to the following conditions:
+
+ The above copyright notice and this permission notice shall be included in all
+ copies or substantial portions of the Software.
+
+ THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+ FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+ COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+ IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+ CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+ """
+
+import json
+import heapq
+from collections import OrderedDict
+
+from nemo.graph import graph as graph_module
+
+THREADS = (2, 4, 8, 16)
+
+
+def list_levels(graph):
+    """
+    returns lists of node indices; every node only reads from nodes in earlier levels, so each list can run concurrently
+    """
+    dependencies = graph.list_dependencies()
+    level = [0] * len(graph.nodes)
+    for i in graph.sort():
+        level[i] = max([level[j] + 1 for j in dependencies[i]] or [0])
+    levels = [[] for _ in range(max(level) + 1 if level else 0)]
+    for i, x in enumerate(level):
+        levels[x].append(i)
+    return levels
+
+
+def find_critical_path(graph, costs):
+    """
+    returns (total cost, node indices) of the most expensive dependency chain
+    """
+    dependencies = graph.list_dependencies()
+    total = [0.0] * len(graph.nodes)
+    previous = [None] * len(graph.nodes)
+    for i in graph.sort():
+        for j in dependencies[i]:
+            if total[j] > total[i]:
+                total[i] = total[j]
+                previous[i] = j
+        total[i] += costs[i]
+    if not total:
+        return 0.0, []
+    i = max(range(len(total)), key=total.__getitem__)
+    path = []
+    while i is not None:
+        path.append(i)
+        i = previous[i]
+    return total[path[0]], path[::-1]
+
+
+def list_components(graph):
+    """
+    returns node indices of the weakly connected components, largest first; they read no variable written by another component
+    """
+    parent = list(range(len(graph.nodes)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, x in enumerate(graph.list_dependencies()):
+        for j in x:
+            parent[find(i)] = find(j)
+    components = OrderedDict()
+    for i in range(len(graph.nodes)):
+        components.setdefault(find(i), []).append(i)
+    return sorted(components.values(), key=lambda x: (-len(x), x[0]))
+
+
+def estimate_level_time(levels, costs, threads):
+    # every level waits for the previous one; nodes within it go greedily to the least busy thread
+    elapsed = 0.0
+    for level in levels:
+        busy = [0.0] * min(threads, len(level))
+        for cost in sorted((costs[i] for i in level), reverse=True):
+            heapq.heappush(busy, heapq.heappop(busy) + cost)
+        elapsed += max(busy)
+    return elapsed
+
+
+def schedule(graph, costs=None):
+    """
+    costs: GRAPH node (method) name -> relative evaluation cost, 1 for the ones not listed
+    """
+    node_costs = [float((costs or {}).get(x.method, 1)) for x in graph.nodes]
+    levels = list_levels(graph)
+    length, path = find_critical_path(graph, node_costs)
+    total = sum(node_costs)
+    speedup = OrderedDict()
+    for threads in THREADS:
+        elapsed = estimate_level_time(levels, node_costs, threads)
+        speedup[str(threads)] = round(total / elapsed, 3) if elapsed else 1.0
+    return OrderedDict([
+        ('nodes', len(graph.nodes)),
+        ('cost', total),
+        ('levels', levels),
+        ('critical_path', OrderedDict([('cost', length), ('nodes', path), ('names', [graph.nodes[i].name for i in path])])),
+        ('components', list_components(graph)),
+        ('speedup', OrderedDict([('bound', round(total / length, 3) if length else 1.0), ('threads', speedup)])),
+    ])
+
+
+def path_schedule(path_graph):
+    # <id>__GRAPH.json -> <id>__SCHEDULE.json
+    return path_graph[:-len('GRAPH.json')] + 'SCHEDULE.json'
+
+
+def dump(data, path):
+    with open(path, 'w') as f:
+        json.dump(data, f)
+
+
+def format_summary(data):
+    lines = ['{} nodes in {} levels, {} components'.format(data['nodes'], len(data['levels']), len(data['components']))]
+    lines.append('widest level: {} nodes'.format(max([len(x) for x in data['levels']] or [0])))
+    lines.append('critical path: {} nodes, cost {} of {}'.format(len(data['critical_path']['nodes']), data['critical_path']['cost'], data['cost']))
+    lines.append('speedup bound: {}, {}'.format(data['speedup']['bound'], ', '.join(
+        '{} threads: {}'.format(k, v) for k, v in data['speedup']['threads'].items())))
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="write the execution schedule of a GRAPH JSON next to it")
+    parser.add_argument('graph')
+    parser.add_argument('--costs', help="JSON file of GRAPH node name -> relative evaluation cost")
+    parser.add_argument('--output')
+    args = parser.parse_args()
+
+    costs = None
+    if args.costs:
+        with open(args.costs) as f:
+            costs = json.load(f)
+    data = schedule(graph_module.load(args.graph), costs)
+    dump(data, args.output or path_schedule(args.graph))
+    print(format_summary(data))
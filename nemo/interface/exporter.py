@@ -262,6 +262,10 @@ class WidgetNemoExporter(QtWidgets.QWidget):
         self.tags_addons.set_button_list(addons)
         layout.addWidget(self.tags_addons)
 
+        btn_coverage = dayu_widgets.MPushButton("Check Coverage")
+        btn_coverage.clicked.connect(self.on_check_coverage)
+        layout.addWidget(btn_coverage)
+
         self.btn_export = dayu_widgets.MPushButton("Parse")
         self.btn_export.clicked.connect(self.on_export)
         layout.addWidget(self.btn_export)
@@ -270,6 +274,18 @@ class WidgetNemoExporter(QtWidgets.QWidget):
         layout.addWidget(self.progress_parse)
         return layout
 
+    def on_check_coverage(self):
+        from nemo.m2n import spec_coverage
+        from nemo.m2n.get_io import get_io
+        inputs, outputs = get_io(self.get_controllers(), self.get_shapes())
+        report = spec_coverage.scan(outputs, inputs, spec_coverage.get_module_paths(self.tags_addons.get_dayu_checked()))
+        if report:
+            print(spec_coverage.format_report(report))
+            QMessageBox.warning(self, "Unsupported node types", '\n'.join(
+                '{}: {} node(s), blocking {} output(s)'.format(k, len(v['nodes']), len(v['outputs'])) for k, v in report.items()))
+        else:
+            QMessageBox.information(self, "Coverage", 'all node types upstream of {} outputs are supported'.format(len(outputs)))
+
     def on_export(self):
         from nemo.m2n import m2n
         path = self.browser_dir_export.dayu_path
@@ -293,11 +309,15 @@ class WidgetNemoExporter(QtWidgets.QWidget):
                          str(path),
                          addons=self.tags_addons.get_dayu_checked(),
                          debug=True,
-                         callback=lambda percent: self.progress_parse.setValue(percent))
+                         callback=lambda percent: self.progress_parse.setValue(percent),
+                         profile=True)
         except Exception as e:
             QMessageBox.critical(self, "Error", str(e))
         else:
-            QMessageBox.information(self, "Success", '{} has been exported to {}'.format(name, path))
+            from nemo.m2n.exporter import list_slowest
+            slowest = list_slowest('{}/{}__PROFILE.json'.format(path, name))
+            QMessageBox.information(self, "Success", '{} has been exported to {}\n\nslowest outputs:\n{}'.format(
+                name, path, '\n'.join('{:.2f}s  {}'.format(x['seconds'], x['name']) for x in slowest)))
 
     def save_config(self):
         config = dict()
@@ -0,0 +1,282 @@
+"""
+ Copyright (c) 2022 OctMedia
+
+ Permission is hereby granted, free of charge, to any person obtaining a copy of
+ this software and associated documentation files (the "Software"), to deal in
+ the Software without restriction, including without limitation the rights to
+ use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+ the Software, and to permit persons to whom the Software is furnished to do so,
+ subject to the following conditions:
+
+ The above copyright notice and this permission notice shall be included in all
+ copies or substantial portions of the Software.
+
+ THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+ FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+ COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+ IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+ CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+ """
+
+from __future__ import print_function
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import subprocess
+
+try:
+    from Queue import Queue, Empty
+except ImportError:
+    from queue import Queue, Empty
+
+# Batch export of many rigs over a pool of reusable mayapy workers.
+#
+#     mayapy -m nemo.m2n.batch manifest.json --workers 8 --log-dir logs
+#
+# manifest:
+#     {
+#         "defaults": {"addons": ["quatNodes", "weightDriver"], "debug": false},
+#         "jobs": [
+#             {"identifier": "Hero", "mayafile": "/rigs/hero.ma", "project_dir": "/out/hero",
+#              "controllers": ["*"], "shapes": ["Geometry|high|"]},
+#             ...
+#         ]
+#     }
+# any key besides identifier, mayafile and project_dir is forwarded to m2n.process.
+
+# seconds a worker gets to initialize maya and report ready
+START_TIMEOUT = 300.0
+
+
+def get_root():
+    if not os.environ.get('NEMO_ROOT'):
+        raise RuntimeError("[Nemo]NEMO_ROOT is not set, it should point to the NemoMaya directory holding modules, lib and extern")
+    return os.environ['NEMO_ROOT']
+
+
+def load_manifest(path):
+    with open(path) as f:
+        manifest = json.load(f)
+    jobs = []
+    for x in manifest['jobs']:
+        job = dict(manifest.get('defaults', {}))
+        job.update(x)
+        for key in ['identifier', 'mayafile', 'project_dir']:
+            if key not in job:
+                raise RuntimeError("[Nemo]job {} misses '{}'".format(x, key))
+        jobs.append(job)
+    return jobs
+
+
+def run_worker():
+    # protocol lines go through a copy of the original stdout, fd 1 goes to stderr so that no other output reaches
+    # the channel, and fd 1 and 2 are redirected to each job's log while it runs
+    channel = os.fdopen(os.dup(sys.stdout.fileno()), 'w')
+    sys.stdout.flush()
+    os.dup2(sys.stderr.fileno(), 1)
+    import maya.standalone
+    maya.standalone.initialize()
+    from maya import cmds
+    platform = "windows" if cmds.about(windows=True) else "centos7"
+    sys.path.insert(0, '{}/extern'.format(get_root()))
+    sys.path.insert(0, '{}/lib/{}-{}'.format(get_root(), platform, cmds.about(version=True)))
+    from nemo.m2n import m2n
+
+    channel.write(json.dumps({'ready': True}) + '\n')
+    channel.flush()
+    for line in iter(sys.stdin.readline, ''):
+        job = json.loads(line)
+        settings = {k: v for k, v in job.items() if k not in {'identifier', 'mayafile', 'project_dir', 'log'}}
+        with open(job['log'], 'w') as log:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            saved = os.dup(1), os.dup(2)
+            os.dup2(log.fileno(), 1)
+            os.dup2(log.fileno(), 2)
+            begin = time.time()
+            result = {'identifier': job['identifier'], 'status': 'succeed', 'error': None}
+            try:
+                m2n.process(str(job['identifier']), str(job['mayafile']), str(job['project_dir']), **settings)
+            except Exception as e:
+                import traceback
+                traceback.print_exc()
+                result['status'] = 'failed'
+                result['error'] = str(e)
+            result['seconds'] = time.time() - begin
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.dup2(saved[0], 1)
+            os.dup2(saved[1], 2)
+            os.close(saved[0])
+            os.close(saved[1])
+        channel.write(json.dumps(result) + '\n')
+        channel.flush()
+
+
+class Worker:
+
+    def __init__(self, executable, timeout=None, start_timeout=START_TIMEOUT):
+        self.executable = executable
+        self.timeout = timeout
+        self.start_timeout = start_timeout
+        self.process = None
+
+    def start(self):
+        env = dict(os.environ)
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        env['PYTHONPATH'] = os.pathsep.join([root] + ([env['PYTHONPATH']] if env.get('PYTHONPATH') else []))
+        self.process = subprocess.Popen([self.executable, '-m', 'nemo.m2n.batch', '--worker'], env=env,
+                                        stdin=subprocess.PIPE, stdout=subprocess.PIPE, universal_newlines=True)
+        watchdog = threading.Timer(self.start_timeout, self.process.kill) if self.start_timeout else None
+        if watchdog:
+            watchdog.start()
+        try:
+            line = self.process.stdout.readline()
+        finally:
+            if watchdog:
+                watchdog.cancel()
+        try:
+            ready = json.loads(line).get('ready')
+        except (ValueError, AttributeError):
+            ready = False
+        if not ready:
+            if self.process.poll() is None:
+                self.process.kill()
+            self.process.wait()
+            self.process = None
+            if not line:
+                raise RuntimeError("[Nemo]batch worker exited or didn't start maya within {}s".format(self.start_timeout))
+            raise RuntimeError("[Nemo]batch worker failed to start maya: {!r}".format(line))
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            try:
+                self.process.stdin.close()
+            except (IOError, OSError):
+                self.process.kill()
+            self.process.wait()
+        self.process = None
+
+    def run(self, job):
+        """
+        runs one job and returns its result; a crashed or timed out worker is restarted for the next job
+        """
+        if self.process is None or self.process.poll() is not None:
+            self.start()
+        begin = time.time()
+        watchdog = threading.Timer(self.timeout, self.process.kill) if self.timeout else None
+        if watchdog:
+            watchdog.start()
+        try:
+            self.process.stdin.write(json.dumps(job) + '\n')
+            self.process.stdin.flush()
+            line = self.process.stdout.readline()
+        except (IOError, OSError):
+            line = ''
+        finally:
+            if watchdog:
+                watchdog.cancel()
+        if line:
+            try:
+                return json.loads(line)
+            except ValueError:
+                # the worker is out of sync with the protocol, it is restarted like a crashed one
+                self.process.kill()
+                self.process.wait()
+                self.process = None
+                return {'identifier': job['identifier'], 'status': 'crashed', 'error': 'unexpected worker output: {!r}'.format(line),
+                        'seconds': time.time() - begin}
+        if self.process.poll() is None:
+            self.process.kill()
+        code = self.process.wait()
+        status = 'timeout' if self.timeout and time.time() - begin >= self.timeout else 'crashed'
+        self.process = None
+        return {'identifier': job['identifier'], 'status': status, 'error': 'worker exited with code {}'.format(code), 'seconds': time.time() - begin}
+
+
+def run(jobs, workers=1, log_dir='.', executable=None, timeout=None, retries=1, start_timeout=START_TIMEOUT):
+    """
+    returns one result per job, in manifest order, with status, seconds, attempts, error and log path.
+    a job whose worker can't start is failed, not retried
+    """
+    get_root()
+    if not os.path.isdir(log_dir):
+        os.makedirs(log_dir)
+    queue = Queue()
+    for i, job in enumerate(jobs):
+        queue.put((i, job, 1))
+    results = [None] * len(jobs)
+
+    def consume():
+        worker = Worker(executable or sys.executable, timeout, start_timeout)
+        try:
+            while True:
+                try:
+                    i, job, attempt = queue.get_nowait()
+                except Empty:
+                    return
+                job = dict(job, log=os.path.abspath(os.path.join(log_dir, '{}.{}.log'.format(job['identifier'], attempt))))
+                try:
+                    result = worker.run(job)
+                except Exception as e:
+                    result = {'identifier': job['identifier'], 'status': 'failed', 'error': str(e), 'seconds': 0.0}
+                result['attempts'] = attempt
+                result['log'] = job['log']
+                # only worker deaths are retried, a failing export would fail again
+                if result['status'] in {'crashed', 'timeout'} and attempt <= retries:
+                    queue.put((i, job, attempt + 1))
+                else:
+                    results[i] = result
+                print('[Nemo]{} {} in {:.1f}s'.format(job['identifier'], result['status'], result['seconds']))
+        finally:
+            worker.stop()
+
+    threads = [threading.Thread(target=consume) for _ in range(max(1, min(workers, len(jobs))))]
+    for x in threads:
+        x.start()
+    for x in threads:
+        x.join()
+    return results
+
+
+def format_summary(results):
+    width = max([len('identifier')] + [len(x['identifier']) for x in results])
+    lines = ['{:<{}}  {:<8}  {:>9}  {:>8}  {}'.format('identifier', width, 'status', 'seconds', 'attempts', 'log')]
+    for x in results:
+        lines.append('{:<{}}  {:<8}  {:>9.1f}  {:>8}  {}'.format(x['identifier'], width, x['status'], x['seconds'], x['attempts'], x['log']))
+    succeed = len([x for x in results if x['status'] == 'succeed'])
+    lines.append('{}/{} succeed, {:.1f}s of export time'.format(succeed, len(results), sum(x['seconds'] for x in results)))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="export many rigs with a pool of mayapy workers")
+    parser.add_argument('manifest', nargs='?')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--log-dir', default='nemo_batch_logs')
+    parser.add_argument('--timeout', type=float, default=None, help="seconds before a job's worker is killed")
+    parser.add_argument('--retries', type=int, default=1, help="times a job is retried after its worker crashed")
+    parser.add_argument('--start-timeout', type=float, default=START_TIMEOUT, help="seconds a worker gets to start maya")
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.worker:
+        return run_worker()
+    if not args.manifest:
+        parser.error("manifest is required")
+
+    begin = time.time()
+    results = run(load_manifest(args.manifest), args.workers, args.log_dir, timeout=args.timeout, retries=args.retries,
+                  start_timeout=args.start_timeout)
+    with open(os.path.join(args.log_dir, 'summary.json'), 'w') as f:
+        json.dump({'seconds': time.time() - begin, 'jobs': results}, f, indent=2)
+    print(format_summary(results))
+    return 0 if all(x['status'] == 'succeed' for x in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -19,22 +19,33 @@
  CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
  """
 
+import hashlib
+import json
+
 import maya.api.OpenMaya as om2
 from maya import cmds
 
 from nemo import utils
+from nemo import trace
+from nemo.attributes import AttributeReader
 from nemo.filter import scene_collect
+from nemo.filter.connections import ConnectionIndex
 
 
-def export(rig_name, controllers, shapes, init_data=None):
+def export(rig_name, controllers, shapes, init_data=None, reader=None, connections=None, curve_library=False):
     data = init_data or dict()
     data['name'] = rig_name
+    reader = reader or AttributeReader()
+    connections = connections or ConnectionIndex(controllers)
 
     controllers_data = dict()
     for x in controllers:
         controllers_data[x] = dict()
-        export_single_controller(rig_name, x, controllers_data[x])
+        with trace.span('export_single_controller', controller=x):
+            export_single_controller(rig_name, x, controllers_data[x], reader, connections)
     data['controllers'] = controllers_data
+    if curve_library:
+        pack_curve_library(data)
 
     mesh_data = dict()
     for x in shapes:
@@ -43,12 +54,13 @@ def export(rig_name, controllers, shapes, init_data=None):
     return data
 
 
-def export_single_controller(rig_name, ctrl, data):
+def export_single_controller(rig_name, ctrl, data, reader=None, connections=None):
+    reader = reader or AttributeReader()
     node_type = cmds.nodeType(ctrl)
     assert node_type in {'transform', 'joint'}
     data['type'] = node_type
 
-    extra = scene_collect.get_extra(ctrl)
+    extra = scene_collect.get_extra(ctrl, connections, reader)
     if extra:
         path = '|{0}|NEMO_{1}|{1}'.format(rig_name, extra)
         data['extra_ctrl_name'] = extra
@@ -65,29 +77,31 @@ def export_single_controller(rig_name, ctrl, data):
         data['jointOrient'] = cmds.getAttr(ctrl + '.jointOrient')[0]
 
     data['attributes'] = []
-    attributes = utils.list_channel_box(ctrl)
+    records = reader.read(ctrl)
+    attributes = utils.list_channel_box(ctrl, reader)
     for attr in ['translateX', 'translateY', 'translateZ', 'rotateX', 'rotateY', 'rotateZ', 'scaleX', 'scaleY', 'scaleZ', 'visibility', 'rotateOrder']:
-        if attr not in attributes and cmds.listConnections('{}.{}'.format(ctrl, attr), s=True, d=False) == [ctrl]:
+        if attr not in attributes and attr in records and records[attr].self_source:
             attributes.append(attr)
     for attr in attributes:
+        record = records[attr]
         attr_data = dict()
         attr_data['name'] = attr
         plug = '{}.{}'.format(ctrl, attr)
 
         attr_data['value'] = cmds.getAttr(plug)
-        attr_data['type'] = cmds.getAttr(plug, type=True)
+        attr_data['type'] = record.type
         if attr_data['type'] == 'enum' and attr not in {'rotateOrder'}:
-            attr_data['enumField'] = utils.get_enum_field(plug)
-        if cmds.getAttr(plug, lock=True):
+            attr_data['enumField'] = record.enum_field
+        if record.lock:
             attr_data['lock'] = True
-        if not cmds.getAttr(plug, keyable=True):
+        if not record.keyable:
             attr_data['keyable'] = False
-        if cmds.attributeQuery(attr, node=ctrl, minExists=True):
-            attr_data['min'] = cmds.attributeQuery(attr, node=ctrl, min=True)[0]
-        if cmds.attributeQuery(attr, node=ctrl, maxExists=True):
-            attr_data['max'] = cmds.attributeQuery(attr, node=ctrl, max=True)[0]
-        if cmds.listConnections(plug, s=True, d=False) == [ctrl]:
-            attr_data['source'] = cmds.listConnections(plug, s=True, d=False, p=True)[0]
+        if record.min is not None:
+            attr_data['min'] = record.min
+        if record.max is not None:
+            attr_data['max'] = record.max
+        if record.self_source:
+            attr_data['source'] = record.source
         data['attributes'].append(attr_data)
 
     if 'rotateOrder' not in attributes and cmds.getAttr('{}.rotateOrder'.format(ctrl)) != 0:
@@ -158,6 +172,27 @@ def export_shape_nurbs_curve(shape, data):
     return True
 
 
+def hash_curve(data):
+    # rounding keeps float noise from splitting identical shapes, +0.0 folds -0.0 into 0.0
+    content = [data['degree'], data['form'], [round(x, 6) + 0.0 for x in data['knots']], [[round(x, 6) + 0.0 for x in cv] for cv in data['cvs']]]
+    return hashlib.sha1(json.dumps(content).encode('utf-8')).hexdigest()[:16]
+
+
+def pack_curve_library(data):
+    library = data.setdefault('curves', dict())
+    for ctrl_data in data['controllers'].values():
+        for shape_data in ctrl_data.get('shapes', []):
+            if shape_data['type'] != 'nurbsCurve':
+                continue
+            key = hash_curve(shape_data)
+            if key not in library:
+                library[key] = {x: shape_data[x] for x in ('degree', 'form', 'knots', 'cvs')}
+            for x in ('degree', 'form', 'knots', 'cvs'):
+                del shape_data[x]
+            shape_data['curve'] = key
+    return library
+
+
 def export_shape_locator(shape, data):
     data['localPosition'] = cmds.getAttr('{}.localPosition'.format(shape))[0]
     data['localScale'] = cmds.getAttr('{}.localScale'.format(shape))[0]
@@ -18,6 +18,74 @@
  IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
  CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
  """
+import sys
+import json
+from timeit import default_timer
+
+from nemo import trace
+
+
+def get_memory():
+    # current resident memory in bytes, only psutil gives it
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss
+
+
+def get_peak_memory():
+    # peak resident memory of the process so far in bytes, None on windows; ru_maxrss is in kilobytes on linux
+    try:
+        import resource
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+
+
+def traced(name, func, *args):
+    with trace.span(name):
+        return func(*args)
+
+
+class Profile:
+
+    def __init__(self, identifier):
+        self.data = {'identifier': identifier, 'outputs': [], 'steps': {}}
+        self.start = default_timer()
+
+    def step(self, name, func, *args):
+        begin = default_timer()
+        with trace.span(name):
+            result = func(*args)
+        self.data['steps'][name] = default_timer() - begin
+        return result
+
+    def output(self, name, func, node_counter=None):
+        memory = get_memory()
+        begin = default_timer()
+        succeed = func(name)
+        record = {'name': name, 'seconds': default_timer() - begin, 'succeed': bool(succeed)}
+        if memory is not None:
+            record['memory_delta'] = get_memory() - memory
+        peak = get_peak_memory()
+        if peak is not None:
+            record['peak_memory'] = peak
+        if node_counter:
+            record['nodes'] = node_counter(name)
+        self.data['outputs'].append(record)
+        return succeed
+
+    def dump(self, path):
+        self.data['seconds'] = default_timer() - self.start
+        with open(path, 'w') as f:
+            json.dump(self.data, f, indent=2)
+
+
+def list_slowest(path_profile, count=10):
+    with open(path_profile) as f:
+        outputs = json.load(f)['outputs']
+    return sorted(outputs, key=lambda x: -x['seconds'])[:count]
 
 
 class Exporter:
@@ -48,23 +116,32 @@ class Exporter:
         self.modules.append(name)
         self.parser.append_module_path('{}/{}.json'.format(self.dir_modules, name))
 
-    def parse(self, inputs, outputs, callback=None):
-        self.parser.set_inputs(inputs)
+    def parse(self, inputs, outputs, callback=None, profile=False, node_counter=None):
+        """
+        with profile, wall time, success, peak memory (and memory delta with psutil) of each output and the time of
+        each parser step are written to path_profile(); node_counter(output) may add the number of nodes each output
+        brings in
+        """
+        profile = Profile(self.identifier) if profile else None
+        step = profile.step if profile else traced
+
+        step('set_inputs', self.parser.set_inputs, inputs)
         succeed = True
         for i, x in enumerate(outputs):
-            if not self.parser.parse(x):
-                succeed = False
+            with trace.span('parse', output=x):
+                if not (profile.output(x, self.parser.parse, node_counter) if profile else self.parser.parse(x)):
+                    succeed = False
             if callback:
                 callback(int(100 * float(i+1) / float(len(outputs))))
-        self.parser.clean()
-        if not succeed:
-            return False
-
-        self.parser.dump_graph(self.path_graph())
-        self.parser.dump_resource(self.path_resource())
-        if self.debug:
-            self.parser.dump_debug(self.path_debug())
-        return True
+        step('clean', self.parser.clean)
+        if succeed:
+            step('dump_graph', self.parser.dump_graph, self.path_graph())
+            step('dump_resource', self.parser.dump_resource, self.path_resource())
+            if self.debug:
+                step('dump_debug', self.parser.dump_debug, self.path_debug())
+        if profile:
+            profile.dump(self.path_profile())
+        return succeed
 
     def check_header(self):
         if not self.dir_proj:
@@ -83,6 +160,10 @@ class Exporter:
         self.check_header()
         return '{}/{}__RESOURCE.nemodata'.format(self.dir_proj, self.identifier)
 
+    def path_profile(self):
+        self.check_header()
+        return '{}/{}__PROFILE.json'.format(self.dir_proj, self.identifier)
+
     def path_debug(self):
         self.check_header()
         return '{}/{}__DEBUG.json'.format(self.dir_proj, self.identifier)
\ No newline at end of file
@@ -0,0 +1,127 @@
+"""
+ Copyright (c) 2022 OctMedia
+
+ Permission is hereby granted, free of charge, to any person obtaining a copy of
+ this software and associated documentation files (the "Software"), to deal in
+ the Software without restriction, including without limitation the rights to
+ use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+ the Software, and to permit persons to whom the Software is furnished to do so,
+ subject to the following conditions:
+
+ The above copyright notice and this permission notice shall be included in all
+ copies or substantial portions of the Software.
+
+ THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+ FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+ COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+ IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+ CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+ """
+
+import os
+import json
+import hashlib
+from collections import OrderedDict
+
+import maya.api.OpenMaya as om2
+
+from spec_coverage import get_plug, get_node_key, get_plug_key
+from staging import hash_file
+
+# Fingerprints only decide whether a whole export can be skipped. The parser builds GRAPH and RESOURCE as a whole and
+# can't merge a partial parse into a previous one, so a single changed output still re-parses every output, and the
+# upstream walk plus getSetAttrCmds of every node is paid on each incremental export, changed or not.
+
+
+def hash_node(obj):
+    """
+    node type, non-default static values and incoming connections of a node
+    """
+    fn = om2.MFnDependencyNode(obj)
+    sha = hashlib.sha1()
+    sha.update('{} {}'.format(get_node_key(obj), fn.typeName).encode('utf-8'))
+    for i in range(fn.attributeCount()):
+        attr = fn.attribute(i)
+        if not om2.MFnAttribute(attr).parent.isNull():
+            continue
+        plug = fn.findPlug(attr, False)
+        if plug.isDestination:
+            continue
+        for x in plug.getSetAttrCmds(om2.MPlug.kNonDefault, True):
+            sha.update(x.encode('utf-8'))
+    for plug in sorted(fn.getConnections(), key=lambda x: x.partialName(useLongNames=True)):
+        source = plug.source()
+        if not source.isNull:
+            sha.update('{} <- {}.{}'.format(plug.partialName(useLongNames=True), *get_plug_key(source)).encode('utf-8'))
+    return sha.hexdigest()
+
+
+class Fingerprinter:
+
+    def __init__(self, inputs=()):
+        self.inputs = {get_plug_key(get_plug(x)) for x in inputs}
+        self.nodes = dict()
+
+    def node(self, obj):
+        key = get_node_key(obj)
+        if key not in self.nodes:
+            self.nodes[key] = hash_node(obj)
+        return key, self.nodes[key]
+
+    def output(self, output):
+        # every node feeding output, stopping at input plugs, hashed in a stable order
+        it = om2.MItDependencyGraph(get_plug(output), om2.MFn.kInvalid, om2.MItDependencyGraph.kUpstream,
+                                    om2.MItDependencyGraph.kDepthFirst, om2.MItDependencyGraph.kPlugLevel)
+        upstream = dict()
+        root = True
+        while not it.isDone():
+            if not root and get_plug_key(it.currentPlug()) in self.inputs:
+                it.prune()
+            else:
+                key, value = self.node(it.currentNode())
+                upstream[key] = value
+            root = False
+            it.next()
+        sha = hashlib.sha1(output.encode('utf-8'))
+        for key in sorted(upstream):
+            sha.update(upstream[key].encode('utf-8'))
+        return sha.hexdigest()
+
+
+def fingerprint(outputs, inputs=()):
+    fingerprinter = Fingerprinter(inputs)
+    return OrderedDict((x, fingerprinter.output(x)) for x in outputs)
+
+
+def get_parser_build(module):
+    # version and binary of the parser module, so a rebuilt NemoMaya parses everything again
+    path = getattr(module, '__file__', None)
+    binary = hash_file(path) if path and os.path.isfile(path) else None
+    return '{} {}'.format(getattr(module, '__version__', None), binary)
+
+
+def hash_settings(**settings):
+    return hashlib.sha1(json.dumps(settings, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def load(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def dump(path, settings, outputs, changed):
+    with open(path, 'w') as f:
+        json.dump({'settings': settings, 'outputs': outputs, 'changed': changed}, f, indent=2)
+
+
+def list_changed(previous, settings, outputs):
+    """
+    outputs that are new, removed or whose fingerprint differs from the previous export, every output if settings differ
+    """
+    if previous is None or previous['settings'] != settings:
+        return list(outputs)
+    removed = [x for x in previous['outputs'] if x not in outputs]
+    return [x for x in outputs if previous['outputs'].get(x) != outputs[x]] + removed
@@ -22,26 +22,30 @@
 from maya import cmds
 
 from nemo.filter import scene_collect
+from nemo.filter.connections import ConnectionIndex
+from nemo.attributes import AttributeReader
 from nemo import utils
 
 
-def get_io(controllers, shapes):
+def get_io(controllers, shapes, connections=None, reader=None):
+    connections = connections or ConnectionIndex(controllers)
+    reader = reader or AttributeReader()
     inputs = []
     outputs = []
     for ctrl in controllers:
-        attributes = set([attr for attr in utils.list_channel_box(ctrl) if not cmds.listConnections("{}.{}".format(ctrl, attr), d=False)])
+        attributes = set([attr for attr in utils.list_channel_box(ctrl, reader) if not connections.is_driven(ctrl, attr)])
 
         for attr in [x for x in attributes if x not in utils.default_attributes(ctrl)]:
             inputs.append("{}.{}".format(ctrl, attr))
 
-        for attr in {'translate', 'rotate', 'scale'}:
+        for attr in ['translate', 'rotate', 'scale']:
             components = []
             driven_components = []
-            for comp in {'X', 'Y', 'Z'}:
+            for comp in ['X', 'Y', 'Z']:
                 x = attr + comp
-                sources = cmds.listConnections("{}.{}".format(ctrl, x), s=True, d=False) or cmds.listConnections("{}.{}".format(ctrl, attr), s=True, d=False)
-                if sources:
-                    if sources != [ctrl]:
+                source = connections.source(ctrl, x) or connections.source(ctrl, attr)
+                if source:
+                    if not source[2]:
                         driven_components.append(x)
                 elif x in attributes:
                     components.append(x)
@@ -66,7 +70,7 @@ def get_io(controllers, shapes):
             outputs.append("{}.lodVisibility".format(cmds.listRelatives(ctrl, shapes=True)[0]))
         else:
             outputs.append("{}.lodVisibility".format(ctrl))
-        extra = scene_collect.get_extra(ctrl)
+        extra = scene_collect.get_extra(ctrl, connections, reader)
         if extra:
             inputs.append('{}.matrix'.format(extra))
 
@@ -82,4 +86,4 @@ def get_io(controllers, shapes):
             outputs.append('{}.worldSpace[0]'.format(shape))
         outputs.append('{}.lodVisibility'.format(shape))
 
-    return list(set(inputs)), list(set(outputs))
+    return sorted(set(inputs)), sorted(set(outputs))
@@ -21,28 +21,115 @@
 
 import os
 import json
-import shutil
 import imp
+from functools import partial
 
 from maya import cmds
 
 from exporter import Exporter
 from get_io import get_io
+from nemo.attributes import AttributeReader
+from nemo.filter.connections import ConnectionIndex
 from nemo.filter.scene_collect import get_controllers, get_meshes
 import export_controllers
-
-
-def _process(identifier, controllers, shapes, project_dir, addons=[], debug=False, callback=None):
-    if os.path.exists(project_dir):
-        shutil.rmtree(project_dir)
-    os.mkdir(project_dir)
-
-    inputs, outputs = get_io(controllers, shapes)
-
-    scene_data = export_controllers.export(identifier, controllers, shapes)
+import spec_coverage
+import fingerprint
+import staging
+from spec_cache import content_key
+from nemo import trace
+from nemo.graph import graph as graph_module
+from nemo.graph import schedule as graph_schedule
+from nemo.cmds_profiler import CommandProfiler
+
+
+def _process(identifier, controllers, shapes, project_dir, addons=[], debug=False, callback=None, curve_library=False, check_coverage=False, profile=False, profile_nodes=False, trace_path=None, cmds_profile_path=None, incremental=False, write_schedule=False):
+    """
+    with incremental, the previous export in project_dir is kept when no output's upstream graph, input,
+    module spec or controller data changed since then; any change re-parses every output
+    with write_schedule, the levels, critical path and components of the graph go to <id>__SCHEDULE.json
+    with profile_nodes, the profile also counts the nodes each output brings in, at the cost of one more upstream walk
+    """
+    if trace_path:
+        trace.start()
+    profiler = CommandProfiler(cmds) if cmds_profile_path else None
+    export = partial(_export, identifier, controllers, shapes, project_dir, addons, debug, callback, curve_library, check_coverage, profile, profile_nodes, incremental, write_schedule)
+    try:
+        with trace.span('m2n._process', identifier=identifier, controllers=len(controllers), shapes=len(shapes)):
+            if not profiler:
+                return export()
+            with profiler:
+                return export()
+    finally:
+        if profiler:
+            profiler.dump(cmds_profile_path)
+        if trace_path:
+            trace.stop(trace_path)
+
+
+def list_artifacts(identifier, project_dir, debug):
+    paths = ['{}/{}__{}'.format(project_dir, identifier, x) for x in ['GRAPH.json', 'RESOURCE.nemodata', 'SCENE.json']]
+    return tuple(paths) + ('{}/{}__DEBUG.json'.format(project_dir, identifier) if debug else None,)
+
+
+def _export(identifier, controllers, shapes, project_dir, addons, debug, callback, curve_library, check_coverage, profile, profile_nodes, incremental, write_schedule):
+    with trace.span('get_io'):
+        reader = AttributeReader()
+        connections = ConnectionIndex(controllers)
+        inputs, outputs = get_io(controllers, shapes, connections, reader)
+    if check_coverage:
+        with trace.span('coverage'):
+            report = spec_coverage.scan(outputs, inputs, spec_coverage.get_module_paths(addons))
+        if report:
+            raise RuntimeError("unsupported node types found, nothing parsed:\n{}".format(spec_coverage.format_report(report)))
+
+    with trace.span('export_controllers'):
+        scene_data = export_controllers.export(identifier, controllers, shapes, reader=reader, connections=connections, curve_library=curve_library)
+
+    if incremental:
+        import NemoMaya
+        with trace.span('fingerprint'):
+            settings = fingerprint.hash_settings(identifier=identifier, inputs=inputs, addons=addons, debug=debug, scene=scene_data,
+                                                 modules=content_key(spec_coverage.get_module_paths(addons)),
+                                                 write_schedule=write_schedule, parser=fingerprint.get_parser_build(NemoMaya))
+            fingerprints = fingerprint.fingerprint(outputs, inputs)
+            path_fingerprint = '{}/{}__FINGERPRINT.json'.format(project_dir, identifier)
+            changed = fingerprint.list_changed(fingerprint.load(path_fingerprint), settings, fingerprints)
+        artifacts = list_artifacts(identifier, project_dir, debug)
+        if not changed and all(os.path.exists(x) for x in artifacts if x):
+            print('[Nemo]{} outputs unchanged since last export, kept {}'.format(len(outputs), project_dir))
+            return artifacts
+        print('[Nemo]{} of {} outputs changed, parsing all of them'.format(len(changed), len(outputs)))
+
+    staging_dir = staging.create(project_dir)
+    try:
+        _parse(identifier, inputs, outputs, scene_data, staging_dir, addons, debug, callback, profile, profile_nodes)
+        if incremental:
+            fingerprint.dump('{}/{}__FINGERPRINT.json'.format(staging_dir, identifier), settings, fingerprints, changed)
+    except BaseException:
+        staging.discard(staging_dir)
+        raise
+    with trace.span('swap_staging'):
+        kept = staging.commit(staging_dir, project_dir)
+    if kept:
+        print('[Nemo]unchanged, kept as-is: {}'.format(', '.join(kept)))
+    if write_schedule:
+        # an offline report, the export is already in place whatever happens here
+        path_graph = '{}/{}__GRAPH.json'.format(project_dir, identifier)
+        try:
+            with trace.span('schedule'):
+                data = graph_schedule.schedule(graph_module.load(path_graph))
+                graph_schedule.dump(data, graph_schedule.path_schedule(path_graph))
+            print(graph_schedule.format_summary(data))
+        except Exception as e:
+            print('[Nemo]no schedule written for {}: {}'.format(path_graph, e))
+    return list_artifacts(identifier, project_dir, debug)
+
+
+def _parse(identifier, inputs, outputs, scene_data, project_dir, addons, debug, callback, profile, profile_nodes):
     path_scene = '{}/{}__SCENE.json'.format(project_dir, identifier)
-    with open(path_scene, 'w') as f:
-        json.dump(scene_data, f)
+    with trace.span('dump_scene'):
+        with open(path_scene, 'w') as f:
+            json.dump(scene_data, f)
 
     import NemoMaya
     exporter = Exporter(NemoMaya.Parser, debug)
@@ -50,31 +137,39 @@ def _process(identifier, controllers, shapes, project_dir, addons=[], debug=Fals
     exporter.set_identifier(identifier)
 
     exporter.set_modules_dir(os.path.realpath('{}/modules'.format(os.environ['NEMO_ROOT'])))
-    for plugin in ['matrixNodes'] + addons:
-        cmds.loadPlugin(plugin, quiet=True)
-        exporter.append_module(plugin)
+    with trace.span('load_plugins'):
+        for plugin in ['matrixNodes'] + addons:
+            cmds.loadPlugin(plugin, quiet=True)
+            exporter.append_module(plugin)
 
-    exporter.init()
+    with trace.span('exporter.init'):
+        exporter.init()
 
     addons_data = []
-    for x in addons:
-        spec_path = '{}/modules/{}.py'.format(os.environ['NEMO_ROOT'], x)
-        if not os.path.exists(spec_path):
-            continue
-        mod = imp.load_source(x, spec_path)
-        addons_data += mod.add_custom_parameters(exporter.parser)
-
-    if not exporter.parse(inputs, outputs, callback):
+    with trace.span('load_addons'):
+        for x in addons:
+            spec_path = '{}/modules/{}.py'.format(os.environ['NEMO_ROOT'], x)
+            if not os.path.exists(spec_path):
+                continue
+            mod = imp.load_source(x, spec_path)
+            addons_data += mod.add_custom_parameters(exporter.parser)
+
+    node_counter = spec_coverage.count_new_nodes(outputs, inputs, spec_coverage.get_module_paths(addons)).get if profile and profile_nodes else None
+    with trace.span('exporter.parse', inputs=len(inputs), outputs=len(outputs)):
+        succeed = exporter.parse(inputs, outputs, callback, profile, node_counter)
+    if not succeed:
         raise RuntimeError("parsing maya file failed, maybe some features unspported yet, please check log for details.")
     # WARNING: addons_data can only be dropped after this moment as parsing done.
     del addons_data
 
-    return exporter.path_graph(), exporter.path_resource(), path_scene, exporter.path_debug() if debug else None
-
 
-def process(identifier, mayafile, project_dir, debug=True):
+def process(identifier, mayafile, project_dir, debug=True, controllers=("*",), shapes=("Geometry|high|", "Geometry|temp|"),
+            addons=("quatNodes", "weightDriver"), controller_filters=None, **kwargs):
+    """
+    controller_filters is forwarded to get_controllers (curve, surface, free, visible), kwargs to _process
+    """
     cmds.file(mayafile, o=True, f=True)
 
-    controllers = get_controllers("*")
-    shapes = get_meshes(["Geometry|high|", "Geometry|temp|"])
-    return _process(identifier, controllers, shapes, project_dir, addons=["quatNodes", "weightDriver"], debug=debug)
+    controllers = get_controllers(list(controllers), **(controller_filters or {}))
+    shapes = get_meshes(list(shapes))
+    return _process(identifier, controllers, shapes, project_dir, addons=list(addons), debug=debug, **kwargs)
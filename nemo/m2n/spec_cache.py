@@ -0,0 +1,96 @@
+"""
+ Copyright (c) 2022 OctMedia
+
+ Permission is hereby granted, free of charge, to any person obtaining a copy of
+ this software and associated documentation files (the "Software"), to deal in
+ the Software without restriction, including without limitation the rights to
+ use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+ the Software, and to permit persons to whom the Software is furnished to do so,
+ subject to the following conditions:
+
+ The above copyright notice and this permission notice shall be included in all
+ copies or substantial portions of the Software.
+
+ THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+ FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+ COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+ IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+ CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+ """
+
+import os
+import json
+import hashlib
+
+# Module specs with redirect and inherit resolved, for the coverage walk and the fingerprint settings. The parser
+# keeps reading the original module files: flattening guesses its resolution rules, and no export compared both.
+
+# bump whenever the flattening rules change so that fingerprints of previous exports don't match
+VERSION = 2
+
+
+def get_returns(method):
+    return tuple(sorted(x['name'] for x in method.get('returns', [])))
+
+
+def merge(base, spec):
+    # local methods and filters come first so the parser tries them before inherited ones;
+    # inherited methods computing the same return plugs as a local one are overridden, filters by target
+    merged = dict(base)
+    merged.update(spec)
+    returns = {get_returns(x) for x in spec.get('methods', [])}
+    merged['methods'] = spec.get('methods', []) + [x for x in base.get('methods', []) if get_returns(x) not in returns]
+    targets = {x['target'] for x in spec.get('filters', [])}
+    merged['filters'] = spec.get('filters', []) + [x for x in base.get('filters', []) if x['target'] not in targets]
+    merged['ignores'] = base.get('ignores', []) + [x for x in spec.get('ignores', []) if x not in base.get('ignores', [])]
+    for key in ['methods', 'filters', 'ignores']:
+        if not merged[key]:
+            del merged[key]
+    return merged
+
+
+def flatten(specs):
+    # specs: node name -> raw spec, later modules already override earlier ones
+    flattened = dict()
+
+    def resolve(name, visiting):
+        if name in flattened:
+            return flattened[name]
+        if name not in specs:
+            raise RuntimeError("[Nemo]unknown node type in module specs: {}".format(name))
+        if name in visiting:
+            raise RuntimeError("[Nemo]cyclic redirect/inherit in module specs: {}".format(name))
+        visiting.add(name)
+        spec = dict(specs[name])
+        if 'redirect' in spec:
+            spec = dict(resolve(spec['redirect'], visiting), name=name)
+        elif 'inherit' in spec:
+            spec = merge(resolve(spec.pop('inherit'), visiting), spec)
+        visiting.discard(name)
+        flattened[name] = spec
+        return spec
+
+    return [resolve(x, set()) for x in specs]
+
+
+def compile_specs(paths):
+    specs = dict()
+    order = []
+    for path in paths:
+        with open(path) as f:
+            for spec in json.load(f):
+                if spec['name'] not in specs:
+                    order.append(spec['name'])
+                specs[spec['name']] = spec
+    flattened = {x['name']: x for x in flatten(specs)}
+    return [flattened[x] for x in order]
+
+
+def content_key(paths):
+    sha = hashlib.sha1(str(VERSION).encode('utf-8'))
+    for path in paths:
+        with open(path, 'rb') as f:
+            sha.update(os.path.realpath(path).encode('utf-8'))
+            sha.update(f.read())
+    return sha.hexdigest()[:16]
@@ -0,0 +1,163 @@
+"""
+ Copyright (c) 2022 OctMedia
+
+ Permission is hereby granted, free of charge, to any person obtaining a copy of
+ this software and associated documentation files (the "Software"), to deal in
+ the Software without restriction, including without limitation the rights to
+ use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+ the Software, and to permit persons to whom the Software is furnished to do so,
+ subject to the following conditions:
+
+ The above copyright notice and this permission notice shall be included in all
+ copies or substantial portions of the Software.
+
+ THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+ FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+ COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+ IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+ CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+ """
+
+import os
+import re
+from collections import OrderedDict
+
+import maya.api.OpenMaya as om2
+
+import spec_cache
+
+# node types the parser reads without a spec
+SOURCES = {'time'}
+
+
+def get_module_paths(addons=()):
+    dir_modules = os.path.realpath('{}/modules'.format(os.environ['NEMO_ROOT']))
+    return ['{}/{}.json'.format(dir_modules, x) for x in ['builtin', 'matrixNodes'] + list(addons)]
+
+
+def strip_indices(name):
+    return re.sub(r'\[[^\]]*\]', '', name)
+
+
+def list_followed_plugs(spec):
+    """
+    returns (own, outside) attribute paths without indices the parser reads through the methods and filters of a
+    flattened spec, ignores removed; outside ones are read on the parent transform
+    """
+    own, outside = set(), set()
+    ignores = set(strip_indices(x) for x in spec.get('ignores', []))
+    for method in spec.get('methods', []):
+        skipped = ignores | set(strip_indices(x) for x in method.get('ignores', []))
+        for x in method.get('parameters', []):
+            name = strip_indices(x['name'])
+            if name not in skipped:
+                (outside if x.get('outside') or x.get('outside_module') else own).add(name)
+    for x in spec.get('filters', []):
+        own.update(strip_indices(y['name']) for y in x['actions'] if y['action'] in ('add', 'select'))
+    return own - ignores, outside - ignores
+
+
+def list_specs(module_paths):
+    # redirected and inheriting types are listed under their own names once flattened
+    return {x['name']: list_followed_plugs(x) for x in spec_cache.compile_specs(module_paths)}
+
+
+def list_supported_types(module_paths):
+    return set(list_specs(module_paths))
+
+
+def get_plug(name):
+    return om2.MGlobal.getSelectionListByName(name).getPlug(0)
+
+
+def get_node_key(obj):
+    if obj.hasFn(om2.MFn.kDagNode):
+        return om2.MDagPath.getAPathTo(obj).fullPathName()
+    return om2.MFnDependencyNode(obj).name()
+
+
+def get_plug_key(plug):
+    return get_node_key(plug.node()), plug.partialName(useLongNames=True)
+
+
+def is_followed(plug, names):
+    # a parameter covers its children and elements: translate covers translate.translateX
+    parts = strip_indices(plug.partialName(useLongNames=True, useFullAttributePath=True)).split('.')
+    return any('.'.join(parts[:i]) in names for i in range(1, len(parts) + 1))
+
+
+def list_sources(obj, names):
+    sources = []
+    for plug in om2.MFnDependencyNode(obj).getConnections():
+        if plug.isDestination and is_followed(plug, names):
+            sources.append((plug, plug.source()))
+    return sources
+
+
+def list_upstream(outputs, inputs=(), specs=None):
+    """
+    returns node -> (type, MObject, first output reaching it) for every node feeding outputs, stopping at input plugs.
+    Like the parser, the walk only goes through the plugs the module specs read, so groupId or message connections
+    don't pull nodes in; it stops at nodes without a spec (and at time, read as the current frame)
+    """
+    specs = list_specs(get_module_paths()) if specs is None else specs
+    inputs = {get_plug_key(get_plug(x)) for x in inputs}
+    nodes = OrderedDict()
+    for output in outputs:
+        pending = [get_plug(output).node()]
+        while pending:
+            obj = pending.pop()
+            key = get_node_key(obj)
+            if key in nodes:
+                continue
+            type_name = om2.MFnDependencyNode(obj).typeName
+            nodes[key] = (type_name, obj, output)
+            if type_name not in specs:
+                continue
+            own, outside = specs[type_name]
+            for plug, source in list_sources(obj, own):
+                if get_plug_key(plug) not in inputs and get_plug_key(source) not in inputs:
+                    pending.append(source.node())
+            # outside parameters are read on the parent transform, which is walked with its own spec
+            if outside and obj.hasFn(om2.MFn.kDagNode):
+                parent = om2.MFnDagNode(obj).parent(0)
+                if not parent.hasFn(om2.MFn.kWorld):
+                    pending.append(parent)
+    return nodes
+
+
+def count_new_nodes(outputs, inputs=(), module_paths=None):
+    # number of nodes each output adds to the ones reached by the outputs before it
+    counts = dict.fromkeys(outputs, 0)
+    for _, _, output in list_upstream(outputs, inputs, list_specs(module_paths or get_module_paths())).values():
+        counts[output] += 1
+    return counts
+
+
+def scan(outputs, inputs=(), module_paths=None):
+    """
+    returns OrderedDict of unsupported node type -> {'nodes': [...], 'outputs': [...]}, most used types first.
+    outputs lists the output each node was first reached from, not every output behind it
+    """
+    specs = list_specs(module_paths or get_module_paths())
+    report = dict()
+    for name, (type_name, obj, output) in list_upstream(outputs, inputs, specs).items():
+        if type_name in specs or type_name in SOURCES:
+            continue
+        entry = report.setdefault(type_name, {'nodes': [], 'outputs': set()})
+        entry['nodes'].append(name)
+        entry['outputs'].add(output)
+
+    result = OrderedDict()
+    for type_name in sorted(report, key=lambda x: (-len(report[x]['nodes']), x)):
+        result[type_name] = {'nodes': report[type_name]['nodes'], 'outputs': sorted(report[type_name]['outputs'])}
+    return result
+
+
+def format_report(report):
+    lines = []
+    for type_name, entry in report.items():
+        lines.append('{}: {} node(s), first reached from {} output(s)'.format(type_name, len(entry['nodes']), len(entry['outputs'])))
+        lines += ['    {}'.format(x) for x in entry['outputs']]
+    return '\n'.join(lines)
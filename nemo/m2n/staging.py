@@ -0,0 +1,84 @@
+"""
+ Copyright (c) 2022 OctMedia
+
+ Permission is hereby granted, free of charge, to any person obtaining a copy of
+ this software and associated documentation files (the "Software"), to deal in
+ the Software without restriction, including without limitation the rights to
+ use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+ the Software, and to permit persons to whom the Software is furnished to do so,
+ subject to the following conditions:
+
+ The above copyright notice and this permission notice shall be included in all
+ copies or substantial portions of the Software.
+
+ THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+ FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+ COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+ IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+ CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+ """
+
+import os
+import shutil
+import hashlib
+import tempfile
+
+
+def create(project_dir):
+    # a sibling of project_dir, so the final renames stay on one filesystem
+    parent = os.path.dirname(os.path.abspath(project_dir))
+    if not os.path.isdir(parent):
+        os.makedirs(parent)
+    staging_dir = tempfile.mkdtemp(prefix='.{}.staging.'.format(os.path.basename(os.path.abspath(project_dir))), dir=parent)
+    # mkdtemp is private to the user, the swapped in directory should get the usual permissions
+    umask = os.umask(0)
+    os.umask(umask)
+    os.chmod(staging_dir, 0o777 & ~umask)
+    return staging_dir
+
+
+def discard(staging_dir):
+    shutil.rmtree(staging_dir, ignore_errors=True)
+
+
+def hash_file(path):
+    sha = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def is_same(path_a, path_b):
+    return os.path.getsize(path_a) == os.path.getsize(path_b) and hash_file(path_a) == hash_file(path_b)
+
+
+def commit(staging_dir, project_dir):
+    """
+    replaces project_dir with staging_dir. New files whose content equals the previous ones get their timestamps,
+    so sync tools can skip them. Returns the names of these files. project_dir is only renamed as a whole, and put
+    back when staging_dir can't take its place, so it never ends up partially replaced.
+    """
+    kept = []
+    if not os.path.isdir(project_dir):
+        os.rename(staging_dir, project_dir)
+        return kept
+    for name in sorted(os.listdir(staging_dir)):
+        path_old = os.path.join(project_dir, name)
+        path_new = os.path.join(staging_dir, name)
+        if os.path.isfile(path_old) and os.path.isfile(path_new) and is_same(path_old, path_new):
+            stat = os.stat(path_old)
+            os.utime(path_new, (stat.st_atime, stat.st_mtime))
+            kept.append(name)
+    backup = tempfile.mkdtemp(prefix='.{}.old.'.format(os.path.basename(os.path.abspath(project_dir))),
+                              dir=os.path.dirname(os.path.abspath(project_dir)))
+    os.rmdir(backup)
+    os.rename(project_dir, backup)
+    try:
+        os.rename(staging_dir, project_dir)
+    except BaseException:
+        os.rename(backup, project_dir)
+        raise
+    shutil.rmtree(backup, ignore_errors=True)
+    return kept
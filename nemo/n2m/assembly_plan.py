@@ -0,0 +1,98 @@
+"""
+ Copyright (c) 2022 OctMedia
+
+ Permission is hereby granted, free of charge, to any person obtaining a copy of
+ this software and associated documentation files (the "Software"), to deal in
+ the Software without restriction, including without limitation the rights to
+ use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+ the Software, and to permit persons to whom the Software is furnished to do so,
+ subject to the following conditions:
+
+ The above copyright notice and this permission notice shall be included in all
+ copies or substantial portions of the Software.
+
+ THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+ FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+ COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+ IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+ CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+ """
+
+ATTRIBUTE_TYPES = {
+    'Float': 'float',
+    'Angle': 'doubleAngle',
+    'Vec3': 'float3',
+    'Euler': 'double3',
+    'Mat4': 'fltMatrix',
+    'Bool': 'bool',
+    'Int': 'long',
+    'Mesh': 'mesh',
+}
+
+
+def inv_var_name(text):
+    return text.replace("__DOT__", '.')
+
+
+def scene_paths(scene_data):
+    paths = dict()
+    for ctrl_name, ctrl_data in scene_data['controllers'].items():
+        paths[ctrl_name] = ctrl_data['path']
+        if 'extra_ctrl_name' in ctrl_data:
+            paths[ctrl_data['extra_ctrl_name']] = ctrl_data['path'].rsplit('|', 1)[0]
+        for shape in ctrl_data.get('shapes', []):
+            paths[shape['name']] = '{}|{}'.format(ctrl_data['path'], shape['name'])
+    for shape_name, shape_data in scene_data['shapes'].items():
+        paths[shape_name] = shape_data['path']
+    return paths
+
+
+def resolve_output(obj, attr, paths):
+    path = paths.get(obj, obj)
+    if attr == 'worldMesh0':
+        return '{}.inMesh'.format(path)
+    if attr == 'worldSpace0':
+        return '{}.create'.format(path)
+    if attr == 'parentMatrix0':
+        if '|' not in path.lstrip('|'):
+            raise RuntimeError("[Nemo]parent of {} is unknown".format(obj))
+        return path.rsplit('|', 1)[0]
+    if attr == 'lodVisibility':
+        segments = path.split('|')
+        for i in range(len(segments) - 1, 0, -1):
+            if segments[i].startswith('NEMO_'):
+                return '{}.visibility'.format('|'.join(segments[:i + 1]))
+        return '{}.visibility'.format(path)
+    return '{}.{}'.format(path, attr)
+
+
+def plan(config, paths, dll_mode, offset_parent_matrix=False):
+    # ('add_attr', port, attribute type), ('input', source plug, port), ('output', port, destination plug),
+    # ('decompose', port, destination transform), ('reset', transform)
+    # hierarchy groups not exported as controllers or shapes take the matrix as offsetParentMatrix; the importers set
+    # their TRS to rootMatrix, so it is reset to identity to not apply rootMatrix twice
+    imported = set(paths.values())
+    operations = []
+    for x in config["inputs"] + config["outputs"]:
+        port = x["name"]
+        typename = x["type"]
+        obj, attr = inv_var_name(port).split('.')
+        if dll_mode:
+            if typename not in ATTRIBUTE_TYPES:
+                raise RuntimeError("[Nemo]unsupported port type {}".format(typename))
+            operations.append(('add_attr', port, ATTRIBUTE_TYPES[typename]))
+
+        if "affectings" in x:
+            dest = resolve_output(obj, attr, paths)
+            if typename == 'Mat4':
+                if offset_parent_matrix and dest not in imported:
+                    operations.append(('reset', dest))
+                    operations.append(('output', port, '{}.offsetParentMatrix'.format(dest)))
+                else:
+                    operations.append(('decompose', port, dest))
+            else:
+                operations.append(('output', port, dest))
+        else:
+            operations.append(('input', '{}.{}'.format(paths.get(obj, obj), attr), port))
+    return operations
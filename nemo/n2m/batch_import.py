@@ -0,0 +1,262 @@
+"""
+ Copyright (c) 2022 OctMedia
+
+ Permission is hereby granted, free of charge, to any person obtaining a copy of
+ this software and associated documentation files (the "Software"), to deal in
+ the Software without restriction, including without limitation the rights to
+ use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+ the Software, and to permit persons to whom the Software is furnished to do so,
+ subject to the following conditions:
+
+ The above copyright notice and this permission notice shall be included in all
+ copies or substantial portions of the Software.
+
+ THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+ FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+ COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+ IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+ CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+ """
+
+import maya.api.OpenMaya as om2
+from maya import cmds
+
+from nemo import utils
+
+CURVE_FORMS = {'Open': om2.MFnNurbsCurve.kOpen, 'Closed': om2.MFnNurbsCurve.kClosed, 'Periodic': om2.MFnNurbsCurve.kPeriodic}
+
+NUMERIC_TYPES = {
+    'bool': om2.MFnNumericData.kBoolean,
+    'byte': om2.MFnNumericData.kByte,
+    'char': om2.MFnNumericData.kChar,
+    'short': om2.MFnNumericData.kShort,
+    'long': om2.MFnNumericData.kInt,
+    'float': om2.MFnNumericData.kFloat,
+    'double': om2.MFnNumericData.kDouble,
+}
+
+UNIT_TYPES = {
+    'doubleLinear': om2.MFnUnitAttribute.kDistance,
+    'doubleAngle': om2.MFnUnitAttribute.kAngle,
+    'time': om2.MFnUnitAttribute.kTime,
+}
+
+DEFAULT_ATTRIBUTES = {
+    'translateX', 'translateY', 'translateZ', 'rotateX', 'rotateY', 'rotateZ', 'scaleX', 'scaleY', 'scaleZ', 'visibility', 'rotatePivot', 'rotatePivotX',
+    'rotatePivotY', 'rotatePivotZ', 'rotatePivotTranslate', 'scalePivot', 'scalePivotX', 'scalePivotY', 'scalePivotZ', 'scalePivotTranslate', 'rotateOrder'
+}
+
+
+def import_from(data):
+    cmds.file(new=True, f=True)
+    undo_state = cmds.undoInfo(q=True, state=True)
+    cmds.undoInfo(stateWithoutFlush=False)
+    try:
+        replay(data)
+    finally:
+        cmds.undoInfo(stateWithoutFlush=undo_state)
+
+
+def replay(data):
+    rig_name = data['name']
+    items = [(x['path'], x['type']) for x in data['controllers'].values()] + [(x['path'], x['type']) for x in data['shapes'].values()]
+    for ctrl_data in data['controllers'].values():
+        for shape in ctrl_data.get('shapes', []):
+            if shape['type'] == 'locator':
+                items.append(('{}|{}'.format(ctrl_data['path'], shape['name']), 'locator'))
+    nodes = {path: handle.object() for path, handle in utils.create_hierarchy(items).items()}
+
+    modifier = om2.MDGModifier()
+    for ctrl_name, ctrl_data in data['controllers'].items():
+        setup_transform(rig_name, ctrl_name, ctrl_data, nodes)
+        for attr_data in ctrl_data.get('attributes', []):
+            if attr_data['name'] in DEFAULT_ATTRIBUTES or attr_data['name'] == 'radius' and ctrl_data['type'] == 'joint':
+                continue
+            attr = create_attribute(attr_data)
+            if attr is None:
+                modifier.commandToExecute(add_attr_command(ctrl_data['path'], attr_data))
+            else:
+                modifier.addAttribute(nodes[ctrl_data['path']], attr)
+    modifier.doIt()
+
+    modifier = om2.MDGModifier()
+    for ctrl_name, ctrl_data in data['controllers'].items():
+        set_attributes(ctrl_data, nodes[ctrl_data['path']], modifier)
+    modifier.doIt()
+
+    curves = dict()
+    for ctrl_name, ctrl_data in data['controllers'].items():
+        obj = nodes[ctrl_data['path']]
+        lock_attributes(ctrl_data, obj)
+        for shape in ctrl_data.get('shapes', []):
+            if shape['type'] == 'nurbsCurve':
+                shape_obj = create_curve(shape, obj, data.get('curves', dict()), curves)
+            elif shape['type'] == 'locator':
+                shape_obj = nodes['{}|{}'.format(ctrl_data['path'], shape['name'])]
+                node = om2.MFnDependencyNode(shape_obj)
+                set_plug_value(node.findPlug('localPosition', False), shape['localPosition'])
+                set_plug_value(node.findPlug('localScale', False), shape['localScale'])
+            else:
+                assert False, shape['type']
+            set_override(shape_obj, shape)
+
+
+def set_matrix(obj, matrix, rotate_order=None):
+    transformation = om2.MTransformationMatrix(om2.MMatrix(matrix))
+    if rotate_order is not None:
+        transformation.reorderRotation(rotate_order + 1)
+    om2.MFnTransform(obj).setTransformation(transformation)
+
+
+def setup_transform(rig_name, ctrl_name, data, nodes):
+    obj = nodes[data['path']]
+    if 'extra_ctrl_name' in data:
+        extra_ctrl_name = data['extra_ctrl_name']
+        set_matrix(nodes['|{}|NEMO_{}'.format(rig_name, extra_ctrl_name)], data['rootMatrix'])
+        extra = nodes['|{0}|NEMO_{1}|{1}'.format(rig_name, extra_ctrl_name)]
+        om2.MFnDependencyNode(extra).findPlug('rotateOrder', False).setInt(data['extra_ctrl_rotateOrder'])
+        set_matrix(extra, data['extra_ctrl_matrix'], data['extra_ctrl_rotateOrder'])
+    else:
+        set_matrix(nodes['|{}|NEMO_{}'.format(rig_name, ctrl_name)], data['rootMatrix'])
+    set_matrix(obj, data['matrix'])
+    om2.MFnDependencyNode(obj).findPlug('rotateOrder', False).setInt(data.get('rotateOrder', 0))
+
+
+def create_attribute(data):
+    name = data['name']
+    attr_type = data['type']
+    if 'enum' == attr_type:
+        fn = om2.MFnEnumAttribute()
+        attr = fn.create(name, name, data['enumField'][0][1] if data['enumField'] else 0)
+        for field, value in data['enumField']:
+            fn.addField(field, value)
+    elif attr_type in UNIT_TYPES:
+        fn = om2.MFnUnitAttribute()
+        attr = fn.create(name, name, UNIT_TYPES[attr_type], 0.0)
+        if 'min' in data:
+            fn.setMin(to_internal_unit(UNIT_TYPES[attr_type], data['min']))
+        if 'max' in data:
+            fn.setMax(to_internal_unit(UNIT_TYPES[attr_type], data['max']))
+    elif attr_type in NUMERIC_TYPES:
+        fn = om2.MFnNumericAttribute()
+        attr = fn.create(name, name, NUMERIC_TYPES[attr_type], 0)
+        if 'min' in data:
+            fn.setMin(data['min'])
+        if 'max' in data:
+            fn.setMax(data['max'])
+    else:
+        return None
+    fn.keyable = True
+    return attr
+
+
+def add_attr_command(path, data):
+    args = ''
+    if 'min' in data:
+        args += ' -hasMinValue true -min {}'.format(data['min'])
+    if 'max' in data:
+        args += ' -hasMaxValue true -max {}'.format(data['max'])
+    return 'addAttr -ln "{}" -at "{}" -k true{} "{}";'.format(data['name'], data['type'], args, path)
+
+
+def to_internal_unit(unit_type, value):
+    if unit_type == om2.MFnUnitAttribute.kAngle:
+        return om2.MAngle(value, om2.MAngle.uiUnit())
+    if unit_type == om2.MFnUnitAttribute.kDistance:
+        return om2.MDistance(value, om2.MDistance.uiUnit())
+    return om2.MTime(value, om2.MTime.uiUnit())
+
+
+def set_plug_value(plug, value):
+    if isinstance(value, (list, tuple)):
+        for i, x in enumerate(value):
+            set_plug_value(plug.child(i), x)
+        return
+    attr = plug.attribute()
+    if attr.hasFn(om2.MFn.kUnitAttribute):
+        unit_type = om2.MFnUnitAttribute(attr).unitType()
+        if unit_type == om2.MFnUnitAttribute.kAngle:
+            plug.setMAngle(to_internal_unit(unit_type, value))
+        elif unit_type == om2.MFnUnitAttribute.kDistance:
+            plug.setMDistance(to_internal_unit(unit_type, value))
+        elif unit_type == om2.MFnUnitAttribute.kTime:
+            plug.setMTime(to_internal_unit(unit_type, value))
+        else:
+            plug.setDouble(value)
+    elif attr.hasFn(om2.MFn.kNumericAttribute) and om2.MFnNumericAttribute(attr).numericType() in {om2.MFnNumericData.kFloat, om2.MFnNumericData.kDouble}:
+        plug.setDouble(value)
+    elif attr.hasFn(om2.MFn.kNumericAttribute) and om2.MFnNumericAttribute(attr).numericType() == om2.MFnNumericData.kBoolean:
+        plug.setBool(bool(value))
+    else:
+        plug.setInt(int(value))
+
+
+def set_attributes(data, obj, modifier):
+    node = om2.MFnDependencyNode(obj)
+    for attr_data in data.get('attributes', []):
+        name = attr_data['name']
+        plug = node.findPlug(name, False)
+        set_plug_value(plug, attr_data['value'])
+        if not attr_data.get('keyable', True):
+            plug.isKeyable = False
+            plug.isChannelBox = True
+        elif name == 'rotateOrder':
+            plug.isKeyable = True
+            plug.isChannelBox = True
+        if attr_data.get('source', ''):
+            modifier.connect(om2.MGlobal.getSelectionListByName(attr_data['source']).getPlug(0), plug)
+
+    if data['type'] == 'joint':
+        node.findPlug('drawStyle', False).setInt(data['jointDrawStyle'])
+        set_plug_value(node.findPlug('jointOrient', False), data['jointOrient'])
+
+    set_override(obj, data)
+
+
+def lock_attributes(data, obj):
+    node = om2.MFnDependencyNode(obj)
+    default_attributes = set(DEFAULT_ATTRIBUTES)
+    if data['type'] == 'joint':
+        default_attributes.add('radius')
+    for attr_data in data.get('attributes', []):
+        name = attr_data['name']
+        default_attributes.discard(name)
+        if attr_data.get('lock', False) and name != 'visibility':
+            node.findPlug(name, False).isLocked = True
+
+    for attr_name in default_attributes:
+        plug = node.findPlug(attr_name, False)
+        plug.isKeyable = False
+        plug.isChannelBox = False
+        plug.isLocked = attr_name != 'visibility'
+
+
+def set_override(obj, data):
+    if not data.get('overrideEnabled', False):
+        return
+    node = om2.MFnDependencyNode(obj)
+    node.findPlug('overrideEnabled', False).setBool(True)
+    node.findPlug('overrideRGBColors', False).setBool(data['overrideRGBColors'])
+    node.findPlug('overrideVisibility', False).setBool(data.get('overrideVisibility', True))
+    if data['overrideRGBColors']:
+        set_plug_value(node.findPlug('overrideColorRGB', False), data['overrideColorRGB'])
+    else:
+        node.findPlug('overrideColor', False).setInt(data['overrideColor'])
+
+
+def curve_arguments(data):
+    return om2.MPointArray([om2.MPoint(*x) for x in data['cvs']]), om2.MDoubleArray(data['knots']), data['degree'], CURVE_FORMS[data['form']]
+
+
+def create_curve(data, parent, library, curves):
+    key = data.get('curve')
+    if key is None:
+        cvs, knots, degree, form = curve_arguments(data)
+    else:
+        if key not in curves:
+            curves[key] = curve_arguments(library[key])
+        cvs, knots, degree, form = curves[key]
+    shape = om2.MFnNurbsCurve().create(cvs, knots, degree, form, False, False, parent)
+    om2.MFnDagNode(shape).setName(data['name'])
+    return shape
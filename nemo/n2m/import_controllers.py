@@ -19,6 +19,7 @@
  CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
  """
 
+import maya.api.OpenMaya as om2
 from maya import cmds
 
 from nemo import utils
@@ -27,15 +28,18 @@ from nemo import utils
 def import_from(data):
     cmds.file(new=True, f=True)
     rig_name = data['name']
+    library = data.get('curves', dict())
+    templates = dict()
+    items = [(x['path'], x['type']) for x in data['controllers'].values()] + [(x['path'], x['type']) for x in data['shapes'].values()]
+    nodes = utils.create_hierarchy(items)
     for ctrl_name, ctrl_data in data['controllers'].items():
-        import_single(rig_name, ctrl_name, ctrl_data)
+        import_single(rig_name, ctrl_name, ctrl_data, library, templates, nodes)
 
-    for shape_name, shape_data in data['shapes'].items():
-        utils.create_from_path(shape_data['path'], shape_data['type'])
 
-
-def import_single(rig_name, ctrl_name, data):
-    utils.create_from_path(data['path'], data['type'])
+def import_single(rig_name, ctrl_name, data, library=None, templates=None, nodes=None):
+    if nodes is None:
+        utils.create_from_path(data['path'], data['type'])
+        nodes = {data['path']: om2.MObjectHandle(om2.MGlobal.getSelectionListByName(data['path']).getDependNode(0))}
     if 'extra_ctrl_name' in data:
         extra_ctrl_name = data['extra_ctrl_name']
         cmds.xform('|{}|NEMO_{}'.format(rig_name, extra_ctrl_name), m=data['rootMatrix'])
@@ -102,12 +106,12 @@ def import_single(rig_name, ctrl_name, data):
             cmds.setAttr('{}.overrideColor'.format(ctrl_name), data['overrideColor'])
 
     for shape in data.get('shapes', []):
-        import_shape(shape, ctrl_name)
+        import_shape(shape, ctrl_name, library, templates, nodes[data['path']].object())
 
 
-def import_shape(data, ctrl_name):
+def import_shape(data, ctrl_name, library=None, templates=None, parent=None):
     if data['type'] == 'nurbsCurve':
-        unique_name = import_shape_nurbs_curve(data, ctrl_name)
+        unique_name = import_shape_nurbs_curve(data, ctrl_name, library, templates, parent)
     elif data['type'] == 'locator':
         unique_name = import_shape_locator(data, ctrl_name)
     else:
@@ -124,14 +128,28 @@ def import_shape(data, ctrl_name):
         cmds.setAttr('{}.overrideColor'.format(unique_name), data['overrideColor'])
 
 
-def import_shape_nurbs_curve(data, ctrl_name):
-    if data['form'] == 'Periodic':
-        curve = cmds.curve(degree=data['degree'], p=data['cvs'], k=data['knots'], periodic=True)
+def import_shape_nurbs_curve(data, ctrl_name, library=None, templates=None, parent=None):
+    key = data.get('curve')
+    if key is not None and templates is not None and key in templates:
+        if parent is None:
+            parent = om2.MGlobal.getSelectionListByName(ctrl_name).getDependNode(0)
+        shape = om2.MFnNurbsCurve().copy(templates[key], parent)
+        om2.MFnDagNode(shape).setName(data['name'])
+        return om2.MDagPath.getAPathTo(shape).partialPathName()
+
+    if key is not None and key not in (library or {}):
+        raise RuntimeError("[Nemo]shape {} refers to curve {} missing from the curve library".format(data['name'], key))
+    curve_data = library[key] if key is not None else data
+    if curve_data['form'] == 'Periodic':
+        curve = cmds.curve(degree=curve_data['degree'], p=curve_data['cvs'], k=curve_data['knots'], periodic=True)
     else:
-        curve = cmds.curve(degree=data['degree'], p=data['cvs'], k=data['knots'])
+        curve = cmds.curve(degree=curve_data['degree'], p=curve_data['cvs'], k=curve_data['knots'])
     shape_name = cmds.parent(cmds.listRelatives(curve, shapes=True)[0], ctrl_name, s=True, add=True)[0]
     cmds.delete(curve)
-    return cmds.rename(shape_name, data['name'])
+    unique_name = cmds.rename(shape_name, data['name'])
+    if key is not None and templates is not None:
+        templates[key] = om2.MGlobal.getSelectionListByName(unique_name).getDependNode(0)
+    return unique_name
 
 
 def import_shape_locator(data, ctrl_name):
@@ -21,24 +21,68 @@
 
 import json
 import import_controllers
+import batch_import
+import assembly_plan
+import maya.api.OpenMaya as om2
 from maya import cmds
 
 
-def inv_var_name(text):
-    return text.replace("__DOT__", '.')
-
-
-def connect_matrix_to_transform(src, obj):
-    node_decompose = cmds.createNode('decomposeMatrix')
-    cmds.connectAttr(src, '%s.inputMatrix' % node_decompose)
-
-    for attr in {'translate', 'rotate', 'scale'}:
-        cmds.connectAttr('{}.output{}'.format(node_decompose, attr.capitalize()), '{}.{}'.format(obj, attr))
-
-
-def assemble(path_config, path_scene, path_bin, path_resource, identifier, dll_mode):
+def create_port_attribute(name, attr_type):
+    if attr_type in {'float3', 'double3'}:
+        children = [create_port_attribute(name + x, 'float' if attr_type == 'float3' else 'doubleAngle') for x in 'XYZ']
+        return om2.MFnNumericAttribute().create(name, name, *children)
+    if attr_type == 'float':
+        return om2.MFnNumericAttribute().create(name, name, om2.MFnNumericData.kFloat)
+    if attr_type == 'bool':
+        return om2.MFnNumericAttribute().create(name, name, om2.MFnNumericData.kBoolean)
+    if attr_type == 'long':
+        return om2.MFnNumericAttribute().create(name, name, om2.MFnNumericData.kInt)
+    if attr_type == 'doubleAngle':
+        return om2.MFnUnitAttribute().create(name, name, om2.MFnUnitAttribute.kAngle)
+    if attr_type == 'fltMatrix':
+        return om2.MFnMatrixAttribute().create(name, name, om2.MFnMatrixAttribute.kFloat)
+    if attr_type == 'mesh':
+        return om2.MFnTypedAttribute().create(name, name, om2.MFnData.kMesh)
+    assert False, attr_type
+
+
+def get_plug(name):
+    return om2.MGlobal.getSelectionListByName(name).getPlug(0)
+
+
+def execute_plan(node, operations):
+    obj = om2.MGlobal.getSelectionListByName(node).getDependNode(0)
+    modifier = om2.MDGModifier()
+    for op in operations:
+        if op[0] == 'add_attr':
+            modifier.addAttribute(obj, create_port_attribute(op[1], op[2]))
+        elif op[0] == 'reset':
+            transform = om2.MGlobal.getSelectionListByName(op[1]).getDependNode(0)
+            om2.MFnTransform(transform).setTransformation(om2.MTransformationMatrix())
+    modifier.doIt()
+
+    fn = om2.MFnDependencyNode(obj)
+    modifier = om2.MDGModifier()
+    for op in operations:
+        if op[0] == 'input':
+            modifier.connect(get_plug(op[1]), fn.findPlug(op[2], False))
+        elif op[0] == 'output':
+            modifier.connect(fn.findPlug(op[1], False), get_plug(op[2]))
+        elif op[0] == 'decompose':
+            node_decompose = om2.MFnDependencyNode(modifier.createNode('decomposeMatrix'))
+            modifier.connect(fn.findPlug(op[1], False), node_decompose.findPlug('inputMatrix', False))
+            for attr in ['translate', 'rotate', 'scale']:
+                modifier.connect(node_decompose.findPlug('output{}'.format(attr.capitalize()), False), get_plug('{}.{}'.format(op[2], attr)))
+    modifier.doIt()
+
+
+def assemble(path_config, path_scene, path_bin, path_resource, identifier, dll_mode, batch=False, offset_parent_matrix=False):
+    if offset_parent_matrix and om2.MGlobal.apiVersion() < 20200000:
+        raise RuntimeError("[Nemo]offsetParentMatrix requires Maya 2020 or later")
+    importer = batch_import if batch else import_controllers
     with open(path_scene) as f:
-        import_controllers.import_from(json.load(f))
+        scene_data = json.load(f)
+    importer.import_from(scene_data)
 
     with open(path_config) as f:
         config = json.load(f)
@@ -61,61 +105,8 @@ def assemble(path_config, path_scene, path_bin, path_resource, identifier, dll_m
     else:
         node = cmds.createNode(identifier)
 
-    ## import rig
-    for x in config["inputs"] + config["outputs"]:
-        name = x["name"]
-        typename = x["type"]
-        obj, attr = inv_var_name(name).split('.')
-        if dll_mode:
-            if "Float" == typename:
-                cmds.addAttr(node, ln=name, at="float")
-            elif "Angle" == typename:
-                cmds.addAttr(node, ln=name, at="doubleAngle")
-            elif "Vec3" == typename:
-                cmds.addAttr(node, ln=name, at="float3")
-                cmds.addAttr(node, ln=name + 'X', at="float", parent=name)
-                cmds.addAttr(node, ln=name + 'Y', at="float", parent=name)
-                cmds.addAttr(node, ln=name + 'Z', at="float", parent=name)
-            elif "Euler" == typename:
-                cmds.addAttr(node, ln=name, at="double3")
-                cmds.addAttr(node, ln=name + 'X', at="doubleAngle", parent=name)
-                cmds.addAttr(node, ln=name + 'Y', at="doubleAngle", parent=name)
-                cmds.addAttr(node, ln=name + 'Z', at="doubleAngle", parent=name)
-            elif "Mat4" == typename:
-                cmds.addAttr(node, ln=name, at="fltMatrix")
-            elif "Bool" == typename:
-                cmds.addAttr(node, ln=name, at="bool")
-            elif "Int" == typename:
-                cmds.addAttr(node, ln=name, at="long")
-            elif "Mesh" == typename:
-                cmds.addAttr(node, ln=name, dt="mesh")
-            else:
-                assert False, typename
-
-        is_output = "affectings" in x
-        if is_output:
-            if attr == 'worldMesh0':
-                dest = '{}.inMesh'.format(obj)
-            elif attr == 'worldSpace0':
-                dest = '{}.create'.format(obj)
-            elif attr == 'parentMatrix0':
-                dest = cmds.listRelatives(obj, p=True)[0]
-            elif attr == 'lodVisibility':
-                segments = cmds.ls(obj, long=True)[0].split('|')[1:]
-                for x in segments[::-1]:
-                    if x.startswith('NEMO_'):
-                        dest = '{}.visibility'.format(x)
-                        break
-                else:
-                    dest = '{}.visibility'.format(obj)
-            else:
-                dest = '{}.{}'.format(obj, attr)
-            if typename == 'Mat4':
-                connect_matrix_to_transform('{}.{}'.format(node, name), dest)
-            else:
-                cmds.connectAttr('{}.{}'.format(node, name), dest)
-        else:
-            cmds.connectAttr('{}.{}'.format(obj, attr), '{}.{}'.format(node, name))
+    operations = assembly_plan.plan(config, assembly_plan.scene_paths(scene_data), dll_mode, offset_parent_matrix)
+    execute_plan(node, operations)
 
     if dll_mode:
         cmds.setAttr('{}.nemo'.format(node), path_config, type="string")
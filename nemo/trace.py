@@ -0,0 +1,84 @@
+"""
+ Copyright (c) 2022 OctMedia
+
+ Permission is hereby granted, free of charge, to any person obtaining a copy of
+ this software and associated documentation files (the "Software"), to deal in
+ the Software without restriction, including without limitation the rights to
+ use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+ the Software, and to permit persons to whom the Software is furnished to do so,
+ subject to the following conditions:
+
+ The above copyright notice and this permission notice shall be included in all
+ copies or substantial portions of the Software.
+
+ THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+ FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+ COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+ IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+ CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+ """
+
+import os
+import json
+import threading
+from timeit import default_timer
+from contextlib import contextmanager
+
+_tracer = None
+
+
+class Tracer:
+    """
+    collects complete ("X") events of the Chrome trace-event format, viewable in Perfetto or chrome://tracing
+    """
+
+    def __init__(self):
+        self.events = []
+        self.origin = default_timer()
+
+    def now(self):
+        return int((default_timer() - self.origin) * 1e6)
+
+    def add(self, name, category, begin, end, args):
+        event = {'name': name, 'cat': category, 'ph': 'X', 'ts': begin, 'dur': end - begin,
+                 'pid': os.getpid(), 'tid': threading.current_thread().ident}
+        if args:
+            event['args'] = args
+        self.events.append(event)
+
+    def dump(self, path):
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': self.events, 'displayTimeUnit': 'ms'}, f)
+
+
+def start():
+    global _tracer
+    _tracer = Tracer()
+    return _tracer
+
+
+def stop(path=None):
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer and path:
+        tracer.dump(path)
+    return tracer
+
+
+def is_enabled():
+    return _tracer is not None
+
+
+@contextmanager
+def span(name, category='nemo', **args):
+    # free when tracing is off, so stages can stay wrapped permanently
+    tracer = _tracer
+    if tracer is None:
+        yield
+        return
+    begin = tracer.now()
+    try:
+        yield
+    finally:
+        tracer.add(name, category, begin, tracer.now(), args)
@@ -19,6 +19,9 @@
  CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
  """
 
+from collections import OrderedDict
+
+import maya.api.OpenMaya as om2
 from maya import cmds
 
 
@@ -33,7 +36,9 @@ def default_attributes(obj):
         return False
 
 
-def list_channel_box(obj):
+def list_channel_box(obj, reader=None):
+    if reader:
+        return reader.list_channel_box(obj)
     _attributes = (cmds.listAttr(obj, k=True) or []) + \
         (cmds.listAttr(obj, cb=True) or [])
     attributes = []
@@ -119,3 +124,35 @@ def create_from_path(path, t):
             real_name = cmds.createNode(node_type, name=name)
         if is_final:
             return name
+
+
+def iter_hierarchy(items):
+    root = OrderedDict()
+    types = dict()
+    for path, t in items:
+        segments = path.split('|')[1:]
+        children = root
+        for segment in segments:
+            children = children.setdefault(segment, OrderedDict())
+        types[path] = t
+
+    queue = [('', name, children) for name, children in root.items()]
+    while queue:
+        next_queue = []
+        for parent, name, children in queue:
+            path = '{}|{}'.format(parent, name)
+            yield path, parent, name, types.get(path, 'transform')
+            next_queue.extend((path, x, y) for x, y in children.items())
+        queue = next_queue
+
+
+def create_hierarchy(items, modifier=None):
+    dag_modifier = modifier or om2.MDagModifier()
+    nodes = dict()
+    for path, parent, name, t in iter_hierarchy(items):
+        obj = dag_modifier.createNode(t, nodes[parent].object() if parent else om2.MObject.kNullObj)
+        dag_modifier.renameNode(obj, name)
+        nodes[path] = om2.MObjectHandle(obj)
+    if modifier is None:
+        dag_modifier.doIt()
+    return nodes